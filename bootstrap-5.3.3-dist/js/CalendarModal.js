@@ -0,0 +1,45 @@
+// Fills the shared event modal of the sharded calendar from the month's JSON shard
+document.addEventListener('DOMContentLoaded', function() {
+    const modal = document.getElementById('eventModal');
+    if (!modal) {
+        return;
+    }
+
+    // Each month's shard is fetched at most once
+    const shards = {};
+    function loadShard(month) {
+        if (!shards[month]) {
+            shards[month] = fetch(`${modal.dataset.shardUrl}/${month}.json`)
+                .then(response => response.json())
+                .catch(error => {
+                    console.error('Error loading calendar shard:', month, error);
+                    delete shards[month];
+                    return [];
+                });
+        }
+        return shards[month];
+    }
+
+    modal.addEventListener('show.bs.modal', async function(showEvent) {
+        const button = showEvent.relatedTarget;
+        if (!button) {
+            return;
+        }
+
+        // Clear the previous event while the shard loads
+        modal.querySelectorAll('[data-field]').forEach(element => element.textContent = '');
+
+        const events = await loadShard(button.dataset.month);
+        const event = events[parseInt(button.dataset.event)];
+        if (!event) {
+            return;
+        }
+
+        modal.querySelectorAll('[data-field]').forEach(element => {
+            element.textContent = event[element.dataset.field] || '';
+        });
+        modal.querySelectorAll('[data-link]').forEach(link => {
+            link.href = event[link.dataset.link] || '#';
+        });
+    });
+});
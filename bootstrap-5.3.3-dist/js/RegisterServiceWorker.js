@@ -0,0 +1,9 @@
+// Registers sw.js from the site root, two levels above this script, so it controls every page
+if ('serviceWorker' in navigator) {
+    const workerUrl = new URL('../../sw.js', document.currentScript.src);
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register(workerUrl).catch(error => {
+            console.error('Error registering service worker:', error);
+        });
+    });
+}
@@ -0,0 +1,159 @@
+// Instant search over the prebuilt index in pages_py/search, fetching only the shards and document blocks a query needs
+document.addEventListener('DOMContentLoaded', function() {
+    const MAX_RESULTS = 8;
+    // Completions of one prefix that are scored, so a one-letter query stays cheap
+    const MAX_EXPANSIONS = 64;
+    const STOP_WORDS = new Set('an and are as at be by for from has in is it of on or our the to we will with you your'.split(' '));
+
+    // Same rules as search_index.tokenize
+    function tokenize(text) {
+        const tokens = text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '').match(/[a-z0-9]+/g) || [];
+        return tokens.filter(token => token.length >= 2 && !STOP_WORDS.has(token));
+    }
+
+    document.querySelectorAll('input[data-search-root]').forEach(input => {
+        const root = input.dataset.searchRoot;
+        const form = input.closest('form');
+        const menu = form.querySelector('.search-results');
+        const shards = {};
+        const blocks = {};
+        let index = null;
+
+        function fetchJSON(name) {
+            return fetch(`${root}pages_py/search/${name}.json`).then(response => response.json());
+        }
+
+        function loadIndex() {
+            if (!index) {
+                index = fetchJSON('index').catch(error => {
+                    console.error('Error loading search index:', error);
+                    index = null;
+                    return {pages: {}, fragments: [], shards: [], docs: 0, block: 1};
+                });
+            }
+            return index;
+        }
+
+        // Shards and document blocks are each fetched at most once
+        function loadOnce(cache, name, empty) {
+            if (!cache[name]) {
+                cache[name] = fetchJSON(name).catch(error => {
+                    console.error('Error loading search data:', name, error);
+                    delete cache[name];
+                    return empty;
+                });
+            }
+            return cache[name];
+        }
+
+        // doc id -> weight for every term that starts with prefix, an exact match counting double
+        async function lookup(prefix, available) {
+            const scores = new Map();
+            // Large shards are split by their first two characters
+            const key = available.includes(prefix.slice(0, 2)) ? prefix.slice(0, 2) : prefix[0];
+            if (!available.includes(key)) {
+                return scores;
+            }
+            const shard = await loadOnce(shards, key, {terms: [], postings: []});
+            let low = 0;
+            let high = shard.terms.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (shard.terms[mid] < prefix) {
+                    low = mid + 1;
+                } else {
+                    high = mid;
+                }
+            }
+            for (let i = low; i < shard.terms.length && i < low + MAX_EXPANSIONS && shard.terms[i].startsWith(prefix); i++) {
+                const boost = shard.terms[i] === prefix ? 2 : 1;
+                const postings = shard.postings[i];
+                let docId = 0;
+                for (let j = 0; j < postings.length; j += 2) {
+                    docId += postings[j];
+                    scores.set(docId, Math.max(scores.get(docId) || 0, postings[j + 1] * boost));
+                }
+            }
+            return scores;
+        }
+
+        // Documents must match every query term; they rank by their summed weights
+        async function search(query) {
+            const terms = tokenize(query);
+            if (!terms.length) {
+                return [];
+            }
+            const data = await loadIndex();
+            const matches = await Promise.all(terms.map(term => lookup(term, data.shards)));
+            const results = [];
+            for (const [docId, score] of matches[0]) {
+                let total = score;
+                for (const other of matches.slice(1)) {
+                    if (!other.has(docId)) {
+                        total = 0;
+                        break;
+                    }
+                    total += other.get(docId);
+                }
+                if (total) {
+                    results.push([total, docId]);
+                }
+            }
+            results.sort((a, b) => b[0] - a[0] || a[1] - b[1]);
+            const top = results.slice(0, MAX_RESULTS).map(([, docId]) => docId);
+            const docs = await Promise.all(top.map(async docId => {
+                const block = await loadOnce(blocks, `docs-${Math.floor(docId / data.block)}`, []);
+                return block[docId % data.block];
+            }));
+            return docs.filter(Boolean).map(doc => [doc, data]);
+        }
+
+        function resultLink([[kind, title, date, page], data]) {
+            const link = document.createElement('a');
+            link.className = 'dropdown-item text-wrap';
+            let url = page || data.pages[kind];
+            // Events and gallery cards are found on their page by a text fragment of the title
+            if (data.fragments.includes(kind)) {
+                url += `#:~:text=${encodeURIComponent(title).replace(/-/g, '%2D')}`;
+            }
+            link.href = /^([a-z]+:|\/)/i.test(url) ? url : root + url;
+            const [year, month, day] = date.split('-').map(Number);
+            const label = document.createElement('small');
+            label.className = 'text-uppercase sase-blue-text d-block';
+            label.textContent = `${kind}, ${new Date(year, month - 1, day).toLocaleDateString('en-US', {month: 'long', day: 'numeric', year: 'numeric'})}`;
+            link.append(label, title);
+            return link;
+        }
+
+        let latest = 0;
+        input.addEventListener('focus', loadIndex, {once: true});
+        input.addEventListener('input', async function() {
+            // Drop answers to queries the user has already typed past
+            const request = ++latest;
+            const docs = await search(input.value);
+            if (request !== latest) {
+                return;
+            }
+            menu.replaceChildren(...docs.map(resultLink));
+            if (!docs.length && tokenize(input.value).length) {
+                const empty = document.createElement('span');
+                empty.className = 'dropdown-item-text text-secondary';
+                empty.textContent = 'No matches';
+                menu.append(empty);
+            }
+            menu.classList.toggle('show', menu.childElementCount > 0);
+        });
+        form.addEventListener('submit', function(submitEvent) {
+            submitEvent.preventDefault();
+            const first = menu.querySelector('a');
+            if (first) {
+                window.location.href = first.href;
+            }
+        });
+        document.addEventListener('click', function(clickEvent) {
+            if (!form.contains(clickEvent.target)) {
+                menu.classList.remove('show');
+            }
+        });
+    });
+});
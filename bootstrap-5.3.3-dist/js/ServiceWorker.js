@@ -0,0 +1,92 @@
+// Serves the pages and assets listed in precache-manifest.json from cache; service_worker.py copies this to the
+// site root as sw.js, prefixed with PRECACHE_VERSION, the manifest's hash, so every new build installs a new worker
+const CACHE_PREFIX = 'sase-precache-';
+const CACHE_NAME = CACHE_PREFIX + PRECACHE_VERSION;
+// Images are cached as they are used rather than precached. Responsive variants are named after their
+// source's hash, so a cached copy never goes stale; other images are served cached and refreshed behind
+const RUNTIME_CACHE = 'sase-images';
+const RUNTIME_PREFIX = 'images/responsive/';
+const SCOPE = self.registration.scope;
+const MANIFEST_URL = new URL('precache-manifest.json', SCOPE).href;
+
+// Files whose hash is unchanged are copied from the previous version's cache; only the rest are downloaded
+async function precache() {
+    const manifest = await fetch(MANIFEST_URL, {cache: 'no-store'}).then(response => response.json());
+    const cache = await caches.open(CACHE_NAME);
+    let previous = {files: {}};
+    let previousCache = null;
+    for (const name of await caches.keys()) {
+        if (name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME) {
+            const oldCache = await caches.open(name);
+            const oldManifest = await oldCache.match(MANIFEST_URL);
+            if (oldManifest) {
+                previous = await oldManifest.json();
+                previousCache = oldCache;
+            }
+        }
+    }
+
+    await Promise.all(Object.entries(manifest.files).map(async ([path, hash]) => {
+        const url = new URL(path, SCOPE).href;
+        const reused = previous.files[path] === hash && await previousCache.match(url);
+        const response = reused || await fetch(url, {cache: 'no-cache'});
+        if (!response.ok) {
+            throw new Error(`Could not precache ${path}: ${response.status}`);
+        }
+        await cache.put(url, response);
+    }));
+    // Stored last, so a cache only counts as a previous version once it is complete
+    await cache.put(MANIFEST_URL, new Response(JSON.stringify(manifest)));
+}
+
+self.addEventListener('install', function(installEvent) {
+    installEvent.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', function(activateEvent) {
+    activateEvent.waitUntil(caches.keys()
+        .then(names => Promise.all(names
+            .filter(name => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+async function cacheFirst(request, key) {
+    const cached = await caches.match(key, {cacheName: CACHE_NAME});
+    if (cached) {
+        return cached;
+    }
+    const variant = key.startsWith(SCOPE + RUNTIME_PREFIX);
+    if (!variant && request.destination !== 'image') {
+        return fetch(request);
+    }
+    const runtime = await caches.open(RUNTIME_CACHE);
+    const image = await runtime.match(key);
+    if (image && variant) {
+        return image;
+    }
+    const refresh = fetch(request).then(async response => {
+        if (response.ok) {
+            await runtime.put(key, response.clone());
+        }
+        return response;
+    });
+    if (image) {
+        refresh.catch(() => {});
+        return image;
+    }
+    return refresh;
+}
+
+self.addEventListener('fetch', function(fetchEvent) {
+    const url = new URL(fetchEvent.request.url);
+    if (fetchEvent.request.method !== 'GET' || url.origin !== self.location.origin || !url.href.startsWith(SCOPE)) {
+        return;
+    }
+    // Cached copies are keyed without the query, and the site root is index.html
+    let key = url.origin + url.pathname;
+    if (key === SCOPE) {
+        key += 'index.html';
+    }
+    fetchEvent.respondWith(cacheFirst(fetchEvent.request, key));
+});
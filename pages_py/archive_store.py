@@ -0,0 +1,162 @@
+import datetime
+import hashlib
+import io
+import os
+import sqlite3
+import build_report
+import csv_loader
+
+# Every event, announcement and gallery event the CSVs have ever listed, relative to pages_py/
+DB_PATH = ".archive.sqlite3"
+
+# Table -> (record type, CSV it is synced from)
+TABLES = {
+    "events": (csv_loader.UpcomingEvent, csv_loader.UPCOMING_EVENTS_CSV),
+    "announcements": (csv_loader.Announcement, csv_loader.ANNOUNCEMENTS_CSV),
+    "gallery_events": (csv_loader.GalleryEvent, csv_loader.GALLERY_EVENTS_CSV),
+}
+
+# Rows are never deleted: a row that leaves its CSV keeps its data and gets removed_on set, and
+# comes back to life if the CSV lists it again. occurrence tells apart rows with the same date and name.
+# live indexes the page queries (rows still in the CSV by date), the primary key the archive ones
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT,
+                                    lines INTEGER, rows INTEGER, generation INTEGER);
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS {table} ({", ".join(f'"{field}" TEXT' for field in record_type.__slots__)},
+                                    occurrence INTEGER NOT NULL, position INTEGER, generation INTEGER, removed_on TEXT,
+                                    PRIMARY KEY (date, name, occurrence));
+CREATE INDEX IF NOT EXISTS {table}_live ON {table} (removed_on, date, position);
+""" for table, (record_type, path) in TABLES.items())
+
+_connection = None
+_connection_key = None
+# A connection inherited over fork is never used or closed in the child, so it stays referenced here
+_inherited = []
+
+def connect():
+    """This process's connection to the store, reopened after a fork or a change of working directory"""
+    global _connection, _connection_key
+    key = (os.getpid(), os.path.abspath(DB_PATH))
+    if _connection is None or _connection_key != key:
+        if _connection is not None and _connection_key[0] != key[0]:
+            _inherited.append(_connection)
+        # Transactions are begun explicitly so a sync can take the write lock before it reads
+        _connection = sqlite3.connect(key[1], timeout=30, isolation_level=None)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.executescript(SCHEMA)
+        _connection_key = key
+    return _connection
+
+def close():
+    global _connection, _connection_key
+    if _connection is not None and _connection_key[0] == os.getpid():
+        _connection.close()
+    _connection = None
+    _connection_key = None
+
+#______________________________________________________________________________
+#sync
+def sync(table):
+    """Bring table up to date with its CSV, parsing only the lines appended since the last sync when that is all that changed"""
+    record_type, path = TABLES[table]
+    stat = os.stat(path)
+    connection = connect()
+    if connection.execute("SELECT mtime_ns, size FROM sources WHERE path = ?", (path,)).fetchone() == (stat.st_mtime_ns, stat.st_size):
+        return
+
+    with build_report.stage("store"):
+        with open(path, "rb") as file:
+            data = file.read()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have synced this CSV while we waited for the lock
+            source = connection.execute("SELECT mtime_ns, size, digest, lines, rows, generation FROM sources WHERE path = ?", (path,)).fetchone()
+            if source is None or source[:2] != (stat.st_mtime_ns, stat.st_size):
+                write_rows(connection, table, path, data, stat, source)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+def write_rows(connection, table, path, data, stat, source):
+    record_type = TABLES[table][0]
+    fields = record_type.__slots__
+    appended = (source is not None and len(data) > source[1] and data[source[1] - 1:source[1]] == b"\n"
+                and hashlib.sha256(data[:source[1]]).hexdigest() == source[2])
+    if appended:
+        # Only the new lines are parsed, after the header so the columns still line up
+        header = data[:data.index(b"\n") + 1]
+        text = (header + data[source[1]:]).decode("utf-8")
+        records = csv_loader.parse_records(record_type, io.StringIO(text, newline=""), path, first_line=source[3] + 1)
+        position, generation = source[4], source[5]
+    else:
+        records = csv_loader.parse_records(record_type, io.StringIO(data.decode("utf-8"), newline=""), path)
+        position, generation = 0, (source[5] if source else 0) + 1
+
+    columns = ", ".join(f'"{field}"' for field in fields)
+    updates = ", ".join(f'"{field}" = excluded."{field}"' for field in fields if field not in ("date", "name"))
+    insert = (f"INSERT INTO {table} ({columns}, occurrence, position, generation, removed_on) "
+              f"VALUES ({', '.join('?' * (len(fields) + 3))}, NULL) ON CONFLICT (date, name, occurrence) DO UPDATE SET "
+              f"{updates}, position = excluded.position, generation = excluded.generation, removed_on = NULL")
+    occurrences = {}
+    for record in records:
+        values = [getattr(record, field) for field in fields]
+        values[fields.index("date")] = record.date.isoformat()
+        key = (values[fields.index("date")], record.name)
+        if key not in occurrences:
+            # Appended rows count the ones already live with the same date and name
+            occurrences[key] = connection.execute(f"SELECT COUNT(*) FROM {table} WHERE date = ? AND name = ? AND removed_on IS NULL",
+                                                  key).fetchone()[0] if appended else 0
+        connection.execute(insert, values + [occurrences[key], position, generation])
+        occurrences[key] += 1
+        position += 1
+
+    if not appended:
+        # Whatever this full sync did not see has left the CSV
+        connection.execute(f"UPDATE {table} SET removed_on = ? WHERE removed_on IS NULL AND generation != ?",
+                           (datetime.date.today().isoformat(), generation))
+    connection.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (path, stat.st_mtime_ns, stat.st_size, hashlib.sha256(data).hexdigest(), data.count(b"\n"), position, generation))
+    build_report.count("rows_stored", len(records))
+
+#______________________________________________________________________________
+#queries
+def select(table, where, params=(), order="date, position", limit=None):
+    """Sync table, then return its matching rows as records"""
+    sync(table)
+    record_type = TABLES[table][0]
+    fields = record_type.__slots__
+    columns = ", ".join(f'"{field}"' for field in fields)
+    query = f"SELECT {columns} FROM {table} WHERE {where} ORDER BY {order}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params = (*params, limit)
+    date_idx = fields.index("date")
+    records = []
+    with build_report.stage("filter"):
+        for row in connect().execute(query, params):
+            values = list(row)
+            values[date_idx] = datetime.date.fromisoformat(values[date_idx])
+            records.append(record_type(*values))
+    return records
+
+def live(table, after=None, through=None, newest_first=False, limit=None):
+    """Rows still in the table's CSV, dated after `after` and up to `through` when given, by date then CSV order"""
+    where = ["removed_on IS NULL"]
+    params = []
+    if after is not None:
+        where.append("date > ?")
+        params.append(after.isoformat())
+    if through is not None:
+        where.append("date <= ?")
+        params.append(through.isoformat())
+    order = "date DESC, position" if newest_first else "date, position"
+    return select(table, " AND ".join(where), params, order, limit)
+
+def archived(table, through, limit=None):
+    """Rows dated up to `through`, newest first, including those dropped from the CSV once their date had passed"""
+    # A row removed before its date came is treated as cancelled rather than archived. Rows of one date are
+    # in reverse occurrence order, so read back oldest first they number their repeats as the CSV did
+    return select(table, "date <= ? AND (removed_on IS NULL OR removed_on > date)", (through.isoformat(),),
+                  "date DESC, occurrence DESC", limit)
@@ -0,0 +1,101 @@
+import json
+import os
+import posixpath
+import build_report
+
+# Image folders the generators read, relative to pages_py/
+ASSET_ROOTS = ["../images/Carousel", "../images/EBoard", "images/event_post"]
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Listings from the last run, reused for every directory whose mtime has not moved
+INDEX_PATH = ".asset_index.json"
+
+_directories = None
+
+def load_index(path=INDEX_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f"Could not read asset index {path}, rescanning")
+        return {}
+
+def scan_directory(directory, cached, directories, restat=False):
+    """Record directory and its subdirectories in directories, only calling scandir where the mtime changed"""
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return
+
+    entry = cached.get(directory)
+    if entry is None or entry["mtime_ns"] != mtime_ns:
+        images = []
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for dir_entry in entries:
+                if dir_entry.is_dir():
+                    subdirs.append(dir_entry.name)
+                elif dir_entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    stat = dir_entry.stat()
+                    images.append([dir_entry.name, stat.st_size, stat.st_mtime_ns])
+        entry = {"mtime_ns": mtime_ns, "images": sorted(images), "subdirs": sorted(subdirs)}
+        build_report.count("directories_scanned")
+    elif restat:
+        # Overwriting a file in place leaves the directory mtime alone, so only a re-stat sees it
+        images = []
+        for name, _, _ in entry["images"]:
+            try:
+                stat = os.stat(posixpath.join(directory, name))
+            except OSError:
+                continue
+            images.append([name, stat.st_size, stat.st_mtime_ns])
+        entry = {**entry, "images": images}
+
+    directories[directory] = entry
+    for subdir in entry["subdirs"]:
+        scan_directory(posixpath.join(directory, subdir), cached, directories, restat)
+
+def refresh(roots=ASSET_ROOTS, path=INDEX_PATH, restat=False):
+    """Bring the index up to date for this run and persist it; call once before the page builders.
+    Sizes and mtimes are those of the last scan of each directory unless restat stats every file again"""
+    global _directories
+    cached = load_index(path)
+    directories = {}
+    for root in roots:
+        scan_directory(posixpath.normpath(root), cached, directories, restat)
+    with open(path, "w") as file:
+        json.dump(directories, file, indent=1, sort_keys=True)
+    _directories = directories
+    return directories
+
+def directory_entry(directory):
+    global _directories
+    if _directories is None:
+        # Worker processes reuse the index the main process wrote this run
+        _directories = load_index()
+    directory = posixpath.normpath(directory)
+    if directory not in _directories:
+        # Outside the indexed roots, scan it now and keep it for the rest of the run
+        scan_directory(directory, {}, _directories)
+    return _directories.get(directory)
+
+def images(directory):
+    """Sorted image file names in directory, or an empty list if it does not exist"""
+    with build_report.stage("scan"):
+        entry = directory_entry(directory)
+        names = [name for name, _, _ in entry["images"]] if entry else []
+    build_report.count("images", len(names))
+    return names
+
+def files(root):
+    """Yield (path, size, mtime_ns) for every image under root, in sorted order"""
+    entry = directory_entry(root)
+    if entry is None:
+        return
+    root = posixpath.normpath(root)
+    for name, size, mtime_ns in entry["images"]:
+        yield posixpath.join(root, name), size, mtime_ns
+    for subdir in entry["subdirs"]:
+        yield from files(posixpath.join(root, subdir))
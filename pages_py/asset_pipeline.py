@@ -0,0 +1,224 @@
+import hashlib
+import os
+import re
+import site_layout
+import templates
+
+# The optimized site is written here at the served URLs (see site_layout): copy it over the site to publish
+DIST_DIR = "../dist"
+
+# Stylesheets the pages load today, purged and bundled into one fingerprinted file in the pages' link order
+STYLESHEETS = ["../bootstrap-5.3.3-dist/css/additional.css", "../bootstrap-5.3.3-dist/css/bootstrap.css"]
+BUNDLE_NAME = "site"
+BUNDLE_DIR = "bootstrap-5.3.3-dist/css"
+
+# The site's own scripts, scanned for classes they put into the DOM
+SITE_SCRIPTS = ["../bootstrap-5.3.3-dist/js/Calender.js", "../bootstrap-5.3.3-dist/js/Gallery.js",
+                "../bootstrap-5.3.3-dist/js/MeetTeam.js", "../bootstrap-5.3.3-dist/js/index.js",
+                "../bootstrap-5.3.3-dist/js/CalendarModal.js", "../bootstrap-5.3.3-dist/js/Search.js"]
+
+# Classes Bootstrap's JavaScript toggles at runtime, so they never appear in the generated HTML
+JS_CLASSES = {
+    "active", "show", "showing", "hide", "fade", "collapse", "collapsing", "collapse-horizontal",
+    "carousel-item-start", "carousel-item-end", "carousel-item-next", "carousel-item-prev", "carousel-fade",
+    "modal-open", "modal-backdrop", "modal-static", "offcanvas-backdrop", "dropdown-menu-end",
+    "tooltip", "tooltip-inner", "tooltip-arrow", "popover", "popover-arrow", "popover-header", "popover-body",
+    "bs-tooltip-auto", "bs-tooltip-top", "bs-tooltip-bottom", "bs-tooltip-start", "bs-tooltip-end",
+    "bs-popover-auto", "bs-popover-top", "bs-popover-bottom", "bs-popover-start", "bs-popover-end",
+    "was-validated", "is-valid", "is-invalid", "disabled",
+}
+
+CLASS_ATTR_RE = re.compile(r"""\bclass(?:Name)?\s*=\s*["'`]([^"'`]*)["'`]""")
+CLASS_LIST_RE = re.compile(r"""classList\.(?:add|remove|toggle|contains)\(([^)]*)\)""")
+QUOTED_RE = re.compile(r"""["'`]([\w-]+)["'`]""")
+ID_ATTR_RE = re.compile(r"""\bid\s*=\s*["']([^"']*)["']""")
+SELECTOR_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+SELECTOR_ID_RE = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+DECLARATION_COLON_RE = re.compile(r"\s*:\s*")
+
+#______________________________________________________________________________
+#used selectors
+def used_names(html_texts, script_texts=()):
+    """Return (classes, ids) referenced by the pages and the site scripts"""
+    classes = set(JS_CLASSES)
+    ids = set()
+    for text in list(html_texts) + list(script_texts):
+        for value in CLASS_ATTR_RE.findall(text):
+            classes.update(value.split())
+        for args in CLASS_LIST_RE.findall(text):
+            classes.update(QUOTED_RE.findall(args))
+        ids.update(ID_ATTR_RE.findall(text))
+    return classes, ids
+
+#______________________________________________________________________________
+#css
+def strip_comments(css):
+    return re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+
+def skip_string(text, i):
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == "\\" else 1
+    return i
+
+def split_rules(css):
+    """Yield (prelude, body) for each top-level block, or (statement, None) for statements like @charset"""
+    start = 0
+    i = 0
+    while i < len(css):
+        char = css[i]
+        if char in "\"'":
+            i = skip_string(css, i)
+        elif char == "{":
+            depth = 1
+            j = i + 1
+            while j < len(css) and depth:
+                if css[j] in "\"'":
+                    j = skip_string(css, j)
+                elif css[j] == "{":
+                    depth += 1
+                elif css[j] == "}":
+                    depth -= 1
+                j += 1
+            yield css[start:i].strip(), css[i + 1:j - 1]
+            start = i = j
+            continue
+        elif char == ";":
+            if css[start:i].strip():
+                yield css[start:i].strip(), None
+            start = i + 1
+        i += 1
+
+def split_selectors(prelude):
+    # Split a selector list on commas that are not inside :is()/:not() parentheses
+    selectors = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prelude):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+def required_part(selector):
+    # Drop the arguments of :not(), :is(), :where(), :has() and friends: a negated class need not be used, and
+    # one of several alternatives is enough, so only names outside parentheses must all appear
+    parts = []
+    depth = 0
+    for char in selector:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0:
+            parts.append(char)
+    return "".join(parts)
+
+def selector_used(selector, classes, ids):
+    selector = required_part(selector)
+    return (all(name in classes for name in SELECTOR_CLASS_RE.findall(selector))
+            and all(name in ids for name in SELECTOR_ID_RE.findall(selector)))
+
+def purge_css(css, classes, ids):
+    """Drop every rule whose selectors all reference a class or id the site never uses"""
+    rules = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            rules.append(prelude + ";")
+        elif prelude.startswith(("@media", "@supports", "@layer", "@container")):
+            inner = purge_css(body, classes, ids)
+            if inner:
+                rules.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            # @keyframes, @font-face and friends are kept whole
+            rules.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [selector for selector in split_selectors(prelude) if selector_used(selector, classes, ids)]
+            if selectors:
+                # Inside a plain rule a colon only separates a property from its value
+                body = DECLARATION_COLON_RE.sub(":", body)
+                rules.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(rules)
+
+def minify_css(css):
+    css = strip_comments(css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+#______________________________________________________________________________
+#html
+PRESERVE_RE = re.compile(r"(<(script|style|pre|textarea)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+
+def minify_html(html):
+    """Drop comments and collapse whitespace, leaving script, style, pre and textarea contents alone"""
+    parts = PRESERVE_RE.split(html)
+    output = []
+    # split() with two groups yields text, whole match, tag name, text, ...
+    for idx in range(0, len(parts), 3):
+        text = HTML_COMMENT_RE.sub("", parts[idx])
+        text = re.sub(r"[ \t\r\f\v]*\n\s*", "\n", text)
+        output.append(re.sub(r"[ \t\r\f\v]+", " ", text))
+        if idx + 1 < len(parts):
+            output.append(parts[idx + 1])
+    return "".join(output).strip() + "\n"
+
+#______________________________________________________________________________
+#fingerprinted output
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+def link_stylesheet(html, bundle_file):
+    """Replace the page's Bootstrap and additional.css links with one link to the bundle in the same directory"""
+    match = re.search(r"""<link\s+href="([^"]*/)additional\.css"[^>]*>""", html)
+    if match is None:
+        return html
+    bundle_link = f'<link href="{match.group(1)}{bundle_file}" rel="stylesheet">'
+    html = html.replace(match.group(0), bundle_link, 1)
+    return re.sub(r"""<link\s+href="[^"]*bootstrap(?:\.min)?\.css"[^>]*>\s*""", "", html)
+
+def optimize_assets(pages):
+    """Purge, minify and fingerprint the CSS for the given generated pages and write minified copies to DIST_DIR"""
+    html_texts = {}
+    for page in pages:
+        with open(page, "r", encoding="utf-8") as file:
+            html_texts[page] = file.read()
+    script_texts = []
+    for path in SITE_SCRIPTS:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                script_texts.append(file.read())
+    classes, ids = used_names(html_texts.values(), script_texts)
+
+    # One purged, minified bundle of every stylesheet, named by its content hash
+    css_parts = []
+    original_size = 0
+    for path in STYLESHEETS:
+        with open(path, "r", encoding="utf-8") as file:
+            css = file.read()
+        original_size += len(css.encode())
+        css_parts.append(purge_css(strip_comments(css), classes, ids))
+    bundle = minify_css("".join(css_parts)).encode()
+    bundle_file = f"{BUNDLE_NAME}.{fingerprint(bundle)}.min.css"
+
+    bundle_dir = os.path.join(DIST_DIR, BUNDLE_DIR)
+    os.makedirs(bundle_dir, exist_ok=True)
+    templates.write_if_changed(os.path.join(bundle_dir, bundle_file), bundle.decode())
+    # Drop bundles from earlier builds
+    for name in os.listdir(bundle_dir):
+        if name.startswith(f"{BUNDLE_NAME}.") and name.endswith(".min.css") and name != bundle_file:
+            os.remove(os.path.join(bundle_dir, name))
+    print(f"CSS bundle {bundle_file}: {original_size // 1024} KB -> {len(bundle) // 1024} KB")
+
+    for page, html in html_texts.items():
+        output = os.path.join(DIST_DIR, site_layout.url_for(page))
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        templates.write_if_changed(output, minify_html(link_stylesheet(html, bundle_file)))
+    return bundle_file
@@ -0,0 +1,291 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import asset_index
+import csv_loader
+import dataset
+import file_generator
+import image_pipeline
+import image_probe
+import templates
+
+# Rows per synthetic CSV, and where results are compared from, relative to pages_py/
+SIZES = (10, 1000, 10000, 100000)
+BASELINE_PATH = ".benchmark_baseline.json"
+# A stage regresses when it is this fraction slower (or larger) than the baseline
+THRESHOLD = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.002
+MIN_PEAK_KB = 64
+
+# Templates the builders fill, copied into each synthetic site
+TEMPLATES = ["index.html", "pages_py/calender.html", "pages_py/meetTeam.html", "pages_py/gallery.html"]
+
+# Fake image folders stay small however many rows there are
+CAROUSEL_IMAGES = 30
+GALLERY_FOLDERS = 200
+EBOARD_IMAGES = 50
+
+WORDS = ["SASE", "Engineering", "Social", "Resume", "Review", "Mixer", "Workshop", "Panel", "Career", "Study",
+         "Night", "Volunteer", "Conference", "Alumni", "Networking", "Games", "Fall", "Spring", "Kickoff", "Banquet"]
+KINDS = ["Social", "Professional Development", "Community Service", "General Body Meeting"]
+TIMES = ["6:00 - 8:00 PM", "8:00-10:00 PM", "11 AM - 1 PM", "7 PM", "TBD"]
+LOCATIONS = ["Houston Grove", "Ohio Union", "Hitchcock Hall", "Dreese Lab"]
+POSITIONS = ["Co-President", "Co-President", "Vice President", "Treasurer", "Secretary", "Co-Outreach Chair",
+             "Co-Outreach Chair", "Webmaster", "Historian"]
+
+#______________________________________________________________________________
+#synthetic site
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def semester_date(rng, start_year, end_year):
+    # Gallery pages only show Autumn (Aug-Dec) and Spring (Jan-May) events
+    month = rng.choice([1, 2, 3, 4, 5, 8, 9, 10, 11, 12])
+    return datetime.date(rng.randint(start_year, end_year), month, rng.randint(1, 28))
+
+def write_csv(path, columns, rows):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+def touch_image(path):
+    # The generators only list and stat images, so a few bytes stand in for a photo
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"\xff\xd8\xff\xd9")
+
+def make_site(root, rows, seed=0):
+    """Lay out a site under root shaped like the real one, with rows rows in every CSV; returns its pages_py/ directory"""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    work_dir = os.path.join(root, "pages_py")
+    csv_dir = os.path.join(root, "CSV_info")
+    os.makedirs(os.path.join(work_dir, "pages_py"))
+    os.makedirs(csv_dir)
+    for template in TEMPLATES:
+        shutil.copyfile(template, os.path.join(work_dir, template))
+    touch_image(os.path.join(root, "images", "sase_logo.png"))
+
+    write_csv(os.path.join(csv_dir, "UpcomingEvents.csv"), csv_loader.UpcomingEvent.columns, [
+        (f"{words(rng, 3)} {i}", (today + datetime.timedelta(days=rng.randint(-365, 730))).strftime("%m/%d/%Y"),
+         rng.choice(KINDS), rng.choice(TIMES), rng.choice(LOCATIONS), words(rng, 30))
+        for i in range(rows)])
+
+    write_csv(os.path.join(csv_dir, "Announcements.csv"), csv_loader.Announcement.columns, [
+        (f"{words(rng, 2)} {i}", (today - datetime.timedelta(days=rng.randint(0, 1000))).strftime("%m/%d/%Y"),
+         words(rng, 40), f"announcement{i % 10}.jpg", rng.choice(["", "Sign Up"]), rng.choice(["", "https://example.com"]))
+        for i in range(rows)])
+
+    gallery = [(f"{words(rng, 2)} {i}", semester_date(rng, today.year - 10, today.year), words(rng, 25), 3)
+               for i in range(rows)]
+    write_csv(os.path.join(csv_dir, "GalleryEvents.csv"), csv_loader.GalleryEvent.columns,
+              [(name, date.strftime("%m/%d/%Y"), description, pics) for name, date, description, pics in gallery])
+    for name, _, _, pics in gallery[:GALLERY_FOLDERS]:
+        for pic in range(pics):
+            touch_image(os.path.join(work_dir, "images", "event_post", name, f"{pic + 1}.jpg"))
+
+    board = [(POSITIONS[i % len(POSITIONS)], f"First{i} Last{i}", rng.choice(["Computer Science", "Chemical Engineering"]),
+              f"member.{i}@osu.edu", rng.choice(["Sophomore", "Junior", "Senior"]), f"https://www.linkedin.com/in/member-{i}/")
+             for i in range(rows)]
+    write_csv(os.path.join(csv_dir, "CurrentBoard.csv"), csv_loader.BoardMember.columns, board)
+    term = f"EBoard{dataset.term(today)}"
+    for _, name, _, _, _, _ in board[:EBOARD_IMAGES]:
+        touch_image(os.path.join(root, "images", "EBoard", term, name.replace(" ", "_") + ".png"))
+
+    slides = [f"{words(rng, 3)} {i}.jpg" for i in range(min(rows, CAROUSEL_IMAGES))]
+    write_csv(os.path.join(csv_dir, "Carousel.csv"), csv_loader.CarouselSlide.columns, [(s.rsplit(".", 1)[0], s) for s in slides])
+    for slide in slides:
+        touch_image(os.path.join(root, "images", "Carousel", slide))
+    return work_dir
+
+#______________________________________________________________________________
+#stages
+def helper_stages(rows):
+    """The generate_* helpers, each run once over every row of its CSV"""
+    events = csv_loader.load_upcoming_events()
+    announcements = csv_loader.load_announcements()
+    gallery_events = csv_loader.load_gallery_events()
+    board = csv_loader.load_current_board()
+    slides = [f"Slide {i}.jpg" for i in range(rows)]
+    links = ("https://calendar.google.com", "ics/event.ics", "https://outlook.office.com")
+
+    def gallery_rows():
+        counter = iter(range(1, len(gallery_events) + 1))
+        for start in range(0, len(gallery_events), 3):
+            file_generator.generate_gallery_row(gallery_events[start:start + 3], counter)
+
+    return {
+        "generate_event_card": lambda: [file_generator.generate_event_card(
+            event.name, event.date.strftime('%B %d'), event.kind, f'data-bs-target="#event{num}Modal"')
+            for num, event in enumerate(events)],
+        "generate_calendar_links": lambda: [file_generator.generate_calendar_links(event) for event in events],
+        "generate_event_html": lambda: [file_generator.generate_event_html(
+            num, event.name, event.date.strftime('%B %d'), event.kind, event.time, event.location, event.description, links)
+            for num, event in enumerate(events)],
+        "generate_eboard_card": lambda: [file_generator.generate_eboard_card(
+            member.position, member.name, member.major, member.email, member.year, member.linkedin, f"card{num}")
+            for num, member in enumerate(board)],
+        "generate_announcement_card": lambda: [file_generator.generate_announcement_card(
+            item.name, item.date.strftime('%B %d, %Y'), item.description, item.image, item.link_button, item.link)
+            for item in announcements],
+        "generate_carousel_item": lambda: [file_generator.generate_carousel_item(slide, num == 0) for num, slide in enumerate(slides)],
+        "generate_carousel": lambda: file_generator.generate_carousel(slides),
+        "generate_event_preview": lambda: [file_generator.generate_event_preview(
+            event.name, event.date.strftime('%B %d'), event.description) for event in events],
+        "generate_gallery_row": gallery_rows,
+    }
+
+def page_stages():
+    def cold(builder):
+        # Time each builder including its CSV loads, as if it were the first page of the build
+        def run():
+            dataset.reset()
+            builder()
+        return run
+
+    return {
+        "update_calendar_content": cold(file_generator.update_calendar_content),
+        "update_meetTeam_content": cold(file_generator.update_meetTeam_content),
+        "update_gallery_content": cold(file_generator.update_gallery_content),
+        "update_index_content": cold(file_generator.update_index_content),
+    }
+
+def time_stage(function, repeat):
+    # Best of repeat runs; the first run of a page builder also writes every output
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def peak_memory(function):
+    """Peak traced allocation in KB while function runs, in a separate run so tracing does not skew the timings"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+def cold_scan():
+    # A full scan each time, as on a first build, rather than reusing the index the previous run wrote
+    if os.path.exists(asset_index.INDEX_PATH):
+        os.remove(asset_index.INDEX_PATH)
+    asset_index.refresh()
+
+def load_csvs():
+    for loader in (csv_loader.load_upcoming_events, csv_loader.load_announcements,
+                   csv_loader.load_gallery_events, csv_loader.load_current_board):
+        loader()
+
+def run_size(rows, repeat):
+    """Benchmark every stage against a synthetic site of rows rows, returning {stage: result}"""
+    results = {}
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sase-bench-") as root:
+        work_dir = make_site(root, rows)
+        os.chdir(work_dir)
+        try:
+            # Module state from the real site (or a previous size) must not leak in
+            templates._cache.clear()
+            image_pipeline._index = None
+            image_probe._sizes = None
+            # The scan and the loaders get the same best-of-repeat timing as every other stage
+            stages = {"asset_index.refresh": cold_scan, "csv_loader": load_csvs, **page_stages(), **helper_stages(rows)}
+            for stage, function in stages.items():
+                results[stage] = {"seconds": time_stage(function, repeat)}
+                results[stage]["peak_kb"] = peak_memory(function)
+        finally:
+            os.chdir(previous_dir)
+            templates._cache.clear()
+            image_pipeline._index = None
+            image_probe._sizes = None
+            asset_index._directories = None
+            dataset.reset()
+    return results
+
+#______________________________________________________________________________
+#baseline comparison
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f"Could not read benchmark baseline {path}")
+        return None
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+def regressions(results, baseline, threshold=THRESHOLD):
+    """List of messages for every stage and size that is more than threshold slower or larger than the baseline"""
+    found = []
+    for size, stages in results.items():
+        for stage, result in stages.items():
+            before = baseline.get(size, {}).get(stage)
+            if before is None:
+                continue
+            for metric, floor, unit in (("seconds", MIN_SECONDS, "s"), ("peak_kb", MIN_PEAK_KB, " KB")):
+                if metric not in result or metric not in before:
+                    continue
+                now, then = result[metric], before[metric]
+                if now > then * (1 + threshold) and now - then > floor:
+                    found.append(f"{stage} @ {size} rows: {metric} {then:.4g}{unit} -> {now:.4g}{unit}"
+                                 f" (+{(now / then - 1) * 100 if then else float('inf'):.0f}%)")
+    return found
+
+def print_results(results):
+    for size, stages in results.items():
+        print(f"\n{size} rows")
+        for stage, result in stages.items():
+            peak = f"{result['peak_kb']:>10} KB" if "peak_kb" in result else ""
+            print(f"  {stage:<28}{result['seconds'] * 1000:>10.2f} ms{peak}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the page builders on synthetic CSVs. Run from pages_py/.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="rows per CSV (default: 10 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, the best is kept (default: 3)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="fail when a stage is this fraction slower or larger than the baseline (default: 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help=f"baseline file (default: {BASELINE_PATH})")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} rows...")
+        results[str(rows)] = run_size(rows, max(args.repeat, 1))
+    print_results(results)
+
+    baseline = load_baseline(args.baseline)
+    if args.save_baseline or baseline is None:
+        save_baseline(results, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    found = regressions(results, baseline, args.threshold)
+    if found:
+        print(f"\n{len(found)} regression(s) past {args.threshold:.0%}:")
+        for message in found:
+            print(f"  {message}")
+        return 1
+    print(f"\nNo regressions past {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
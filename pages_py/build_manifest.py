@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import asset_index
+import templates
+
+# Manifest of input hashes from the last build, relative to pages_py/
+MANIFEST_PATH = ".build_manifest.json"
+
+def hash_file(path, digest):
+    # Feed a file's bytes into the digest; missing files hash as a marker
+    digest.update(path.encode())
+    if not os.path.exists(path):
+        digest.update(b"<missing>")
+        return
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+
+def hash_template(path, regions, digest):
+    """Hash the static parts of a template, skipping the bodies of the named generated regions"""
+    digest.update(path.encode())
+    if not os.path.exists(path):
+        digest.update(b"<missing>")
+        return
+    template = templates.load(path)
+    if template.missing(*regions):
+        # Markers are broken, hash everything so the builder runs and reports it
+        digest.update(template.content.encode())
+        return
+    for part in template.static_parts(regions):
+        digest.update(part.encode())
+        digest.update(b"\0")
+
+def hash_directory(path, digest):
+    # Hash a directory's image listing by name, size and mtime from the asset index rather than reading every image
+    digest.update(path.encode())
+    if asset_index.directory_entry(path) is None:
+        digest.update(b"<missing>")
+        return
+    entries = [f"{name}:{size}:{mtime_ns}" for name, size, mtime_ns in asset_index.files(path)]
+    digest.update("\n".join(entries).encode())
+
+def page_digest(csv_files=(), template=None, regions=(), image_dirs=(), build_date=None, sources=(), options=None, output=None):
+    """Combine every input of a page into a single hex digest"""
+    digest = hashlib.sha256()
+    for path in csv_files:
+        hash_file(path, digest)
+    if template is not None:
+        hash_template(template, regions, digest)
+    if output is not None:
+        digest.update(f"output:{output}".encode())
+    for path in image_dirs:
+        hash_directory(path, digest)
+    for path in sources:
+        hash_file(path, digest)
+    if build_date is not None:
+        digest.update(f"date:{build_date}".encode())
+    if options:
+        digest.update(json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f"Could not read build manifest {path}, rebuilding everything")
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
@@ -0,0 +1,80 @@
+import contextlib
+import datetime
+import json
+import time
+
+# Where --report writes by default, relative to pages_py/
+REPORT_PATH = "build_report.json"
+
+def new_section():
+    return {"seconds": 0.0, "stages": {}, "counters": {}}
+
+# Work done outside any page goes to "run"; each page builder gets its own section while it runs
+_run = {"stages": {}, "counters": {}}
+_current = _run
+_started = None
+_stack = []
+_pages = {}
+
+#______________________________________________________________________________
+#recording
+@contextlib.contextmanager
+def stage(name):
+    """Time the block as stage name of the current section, excluding time spent in stages nested inside it"""
+    # [start, seconds spent in nested stages]
+    frame = [time.perf_counter(), 0.0]
+    _stack.append(frame)
+    try:
+        yield
+    finally:
+        _stack.pop()
+        elapsed = time.perf_counter() - frame[0]
+        stages = _current["stages"]
+        stages[name] = stages.get(name, 0.0) + elapsed - frame[1]
+        if _stack:
+            _stack[-1][1] += elapsed
+
+def count(name, amount=1):
+    counters = _current["counters"]
+    counters[name] = counters.get(name, 0) + amount
+
+#______________________________________________________________________________
+#page sections
+def begin_page():
+    """Start a fresh section for a page builder; runs in whichever process builds the page"""
+    global _current, _started
+    _current = new_section()
+    _started = time.perf_counter()
+
+def end_page():
+    """Close the page's section and return it, so worker processes can hand it back to the main process"""
+    global _current
+    section = _current
+    section["seconds"] = time.perf_counter() - _started
+    _current = _run
+    return section
+
+def record_page(page, section, status):
+    _pages[page] = {"status": status, **section}
+
+#______________________________________________________________________________
+#report
+def report(**details):
+    """The run and every page recorded so far as a JSON-ready dict, with stage and counter totals across pages"""
+    totals = {"stages": dict(_run["stages"]), "counters": dict(_run["counters"])}
+    for section in _pages.values():
+        for key in ("stages", "counters"):
+            for name, value in section[key].items():
+                totals[key][name] = totals[key].get(name, 0) + value
+    return {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        **details,
+        "run": _run,
+        "pages": _pages,
+        "totals": totals,
+    }
+
+def write_report(path=REPORT_PATH, **details):
+    with open(path, "w") as file:
+        json.dump(report(**details), file, indent=2, sort_keys=True)
+    print(f"Wrote build report to {path}")
@@ -0,0 +1,171 @@
+import csv
+import datetime
+import importlib.util
+import subprocess
+import sys
+import build_report
+
+# CSV sources, relative to pages_py/
+CSV_DIR = "../CSV_info"
+UPCOMING_EVENTS_CSV = f"{CSV_DIR}/UpcomingEvents.csv"
+ANNOUNCEMENTS_CSV = f"{CSV_DIR}/Announcements.csv"
+GALLERY_EVENTS_CSV = f"{CSV_DIR}/GalleryEvents.csv"
+CURRENT_BOARD_CSV = f"{CSV_DIR}/CurrentBoard.csv"
+CAROUSEL_CSV = f"{CSV_DIR}/Carousel.csv"
+# Boards of past academic terms, e.g. Board24-25.csv, in the same columns as CurrentBoard.csv
+BOARD_TERM_CSV = f"{CSV_DIR}/Board{{term}}.csv"
+
+# Date formats used across the CSVs, tried in order
+DATE_FORMATS = ('%m/%d/%Y', '%d-%b-%Y', '%Y-%m-%d')
+
+def parse_date(value):
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+#______________________________________________________________________________
+#record types
+class Record:
+    """Base for the CSV row types; `columns` lists the CSV header for each slot in order"""
+    __slots__ = ()
+    columns = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class UpcomingEvent(Record):
+    __slots__ = ("name", "date", "kind", "time", "location", "description")
+    columns = ("Name", "Date", "Kind", "Time", "Location", "Description")
+
+class Announcement(Record):
+    __slots__ = ("name", "date", "description", "image", "link_button", "link")
+    columns = ("Name", "Date", "Description", "Image", "Link Button", "Link")
+
+class GalleryEvent(Record):
+    __slots__ = ("name", "date", "description", "num_pics")
+    columns = ("Name", "Date", "Description", "Num of Pics")
+
+class BoardMember(Record):
+    __slots__ = ("position", "name", "major", "email", "year", "linkedin")
+    columns = ("Position", "Name", "Major", "Email", "Year", "LinkedIn")
+
+class CarouselSlide(Record):
+    __slots__ = ("title", "image")
+    columns = ("Title", "Image")
+
+#______________________________________________________________________________
+#loaders
+def load_records(record_type, path):
+    """Read a CSV into a list of record_type, parsing the date column once"""
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        return parse_records(record_type, file, path)
+
+def parse_records(record_type, lines, path, first_line=2):
+    """Parse CSV lines, header first, into a list of record_type; first_line numbers the row after the header"""
+    records = []
+    with build_report.stage("csv"):
+        reader = csv.reader(lines, skipinitialspace=True)
+        header = [column.strip() for column in next(reader, [])]
+        try:
+            positions = [header.index(column) for column in record_type.columns]
+        except ValueError as error:
+            raise ValueError(f"{path} is missing a column: {error}") from None
+        date_idx = record_type.__slots__.index("date") if "date" in record_type.__slots__ else None
+
+        for line_num, row in enumerate(reader, start=first_line):
+            if not any(cell.strip() for cell in row):
+                continue
+            values = [row[pos].strip() if pos < len(row) else "" for pos in positions]
+            if date_idx is not None:
+                try:
+                    values[date_idx] = parse_date(values[date_idx])
+                except ValueError as error:
+                    print(f"Skipping line {line_num} of {path}: {error}")
+                    continue
+            records.append(record_type(*values))
+    build_report.count("rows", len(records))
+    return records
+
+def load_upcoming_events(path=UPCOMING_EVENTS_CSV):
+    return load_records(UpcomingEvent, path)
+
+def load_announcements(path=ANNOUNCEMENTS_CSV):
+    return load_records(Announcement, path)
+
+def load_gallery_events(path=GALLERY_EVENTS_CSV):
+    return load_records(GalleryEvent, path)
+
+def load_current_board(path=CURRENT_BOARD_CSV):
+    return load_records(BoardMember, path)
+
+def load_carousel(path=CAROUSEL_CSV):
+    return load_records(CarouselSlide, path)
+
+#______________________________________________________________________________
+#startup comparison
+# Each side runs in a fresh interpreter, imports what it needs and ends with the same records the pages use:
+# events from today on soonest first, announcements up to today newest first, gallery events newest first, the board
+STDLIB_STARTUP = """
+import time
+start = time.perf_counter()
+import datetime
+import csv_loader
+today = datetime.date.today()
+events = sorted((event for event in csv_loader.load_upcoming_events() if event.date >= today), key=lambda event: event.date)
+announcements = sorted((item for item in csv_loader.load_announcements() if item.date <= today), key=lambda item: item.date, reverse=True)
+gallery = sorted(csv_loader.load_gallery_events(), key=lambda event: event.date, reverse=True)
+board = csv_loader.load_current_board()
+print((time.perf_counter() - start) * 1000, len(events), len(announcements), len(gallery), len(board))
+"""
+PANDAS_STARTUP = """
+import time
+start = time.perf_counter()
+import pandas as pd
+import csv_loader
+def dated(path):
+    frame = pd.read_csv(path, skipinitialspace=True, on_bad_lines="skip")
+    frame["Date"] = pd.to_datetime(frame["Date"].str.strip(), format="mixed", errors="coerce")
+    return frame.dropna(subset=["Date"])
+today = pd.Timestamp.now().normalize()
+events = dated(csv_loader.UPCOMING_EVENTS_CSV)
+events = events[events["Date"] >= today].sort_values("Date", kind="stable")
+announcements = dated(csv_loader.ANNOUNCEMENTS_CSV)
+announcements = announcements[announcements["Date"] <= today].sort_values("Date", ascending=False, kind="stable")
+gallery = dated(csv_loader.GALLERY_EVENTS_CSV).sort_values("Date", ascending=False, kind="stable")
+board = pd.read_csv(csv_loader.CURRENT_BOARD_CSV, skipinitialspace=True, on_bad_lines="skip")
+print((time.perf_counter() - start) * 1000, len(events), len(announcements), len(gallery), len(board))
+"""
+
+def time_startup(code):
+    # (milliseconds, record counts) of one side, or None if it could not run
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exited with {result.returncode}")
+        return None
+    milliseconds, *counts = result.stdout.split()[-5:]
+    return float(milliseconds), [int(count) for count in counts]
+
+def compare_startup():
+    """Time this loader against the old pandas path end to end, imports included, each in a fresh interpreter"""
+    stdlib = time_startup(STDLIB_STARTUP)
+    print(f"csv_loader:  {stdlib[0]:.1f} ms" if stdlib else "csv_loader:  failed")
+    if importlib.util.find_spec("pandas") is None:
+        print("pandas:      not installed")
+        return
+    pandas = time_startup(PANDAS_STARTUP)
+    print(f"pandas:      {pandas[0]:.1f} ms" if pandas else "pandas:      failed")
+    if stdlib and pandas and stdlib[1] != pandas[1]:
+        # Rows pandas reads differently (e.g. a date neither side can parse) make the two not quite like for like
+        print(f"Record counts differ (events, announcements, gallery, board): {stdlib[1]} vs {pandas[1]}")
+
+if __name__ == "__main__":
+    compare_startup()
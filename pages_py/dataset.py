@@ -0,0 +1,117 @@
+import datetime
+import functools
+import os
+import archive_store
+import build_report
+import csv_loader
+
+# CSVs the dataset reads; a change to any of them (or a new day) starts a fresh dataset
+SOURCES = (csv_loader.UPCOMING_EVENTS_CSV, csv_loader.ANNOUNCEMENTS_CSV, csv_loader.GALLERY_EVENTS_CSV, csv_loader.CURRENT_BOARD_CSV)
+
+def semester(date):
+    """'Autumn' for Aug-Dec, 'Spring' for Jan-May, None for the summer months the gallery leaves out"""
+    if 8 <= date.month <= 12:
+        return "Autumn"
+    if 1 <= date.month <= 5:
+        return "Spring"
+    return None
+
+def term(date):
+    """The academic year date falls in as 'yy-yy', a new one starting each August"""
+    start = date.year if date.month >= 8 else date.year - 1
+    return f"{start % 100:02d}-{(start + 1) % 100:02d}"
+
+class Dataset:
+    """The data of one build: date views over the archive store and the board CSV, each read once on first use"""
+
+    def __init__(self, today=None):
+        self.today = today or datetime.date.today()
+
+    @functools.cached_property
+    def events(self):
+        """Every upcoming event, soonest first"""
+        return archive_store.live("events")
+
+    def future_events(self, limit=None):
+        """Events after today, soonest first, at most limit of them"""
+        return archive_store.live("events", after=self.today, limit=limit)
+
+    def past_events(self, limit=None):
+        """Events up to today that the CSV has listed, still or before they were dropped, most recent first"""
+        return archive_store.archived("events", through=self.today, limit=limit)
+
+    @functools.cached_property
+    def past_event_terms(self):
+        """term -> that academic year's past events oldest first, newest term first"""
+        terms = {}
+        for event in reversed(self.past_events()):
+            terms.setdefault(term(event.date), []).append(event)
+        return dict(sorted(terms.items(), reverse=True))
+
+    def recent_announcements(self, limit=None):
+        """Announcements dated today or earlier, most recent first, at most limit of them"""
+        return archive_store.live("announcements", through=self.today, newest_first=True, limit=limit)
+
+    @functools.cached_property
+    def gallery_events(self):
+        """Every gallery event, most recent first"""
+        return archive_store.live("gallery_events", newest_first=True)
+
+    @functools.cached_property
+    def gallery_semesters(self):
+        """(season, year, events) for each semester with gallery events, in page order: newest year first, Autumn before Spring"""
+        buckets = {}
+        with build_report.stage("filter"):
+            # Walking the events newest first fills the buckets in exactly that order
+            for event in self.gallery_events:
+                season = semester(event.date)
+                if season is not None:
+                    buckets.setdefault((season, event.date.year), []).append(event)
+        return [(season, year, events) for (season, year), events in buckets.items()]
+
+    @functools.cached_property
+    def gallery_terms(self):
+        """term -> that academic year's (season, year, events), newest term and semester first"""
+        terms = {}
+        for season, year, events in self.gallery_semesters:
+            terms.setdefault(term(events[0].date), []).append((season, year, events))
+        return terms
+
+    @functools.cached_property
+    def board(self):
+        """Current board members in CSV order"""
+        return csv_loader.load_current_board()
+
+    def board_for(self, board_term):
+        """Board members of an academic term in CSV order, or None when there is no CSV for it"""
+        if board_term == term(self.today):
+            return self.board
+        path = csv_loader.BOARD_TERM_CSV.format(term=board_term)
+        return csv_loader.load_records(csv_loader.BoardMember, path) if os.path.exists(path) else None
+
+#______________________________________________________________________________
+#build-scoped instance
+_dataset = None
+_key = None
+
+def stamp(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def current():
+    """The dataset shared by every page built in this process, replaced when a CSV changes or the date rolls over"""
+    global _dataset, _key
+    key = (datetime.date.today(), tuple(stamp(path) for path in SOURCES))
+    if _dataset is None or key != _key:
+        _dataset = Dataset(key[0])
+        _key = key
+    return _dataset
+
+def reset():
+    global _dataset, _key
+    _dataset = None
+    _key = None
+    archive_store.close()
@@ -1,111 +1,159 @@
-import pandas as pd
+import argparse
+import collections
+import concurrent.futures
+import cProfile
 import datetime
+import filecmp
+import functools
+import itertools
+import json
 import os
+import re
+import sys
+import time
+import archive_store
+import asset_index
+import asset_pipeline
+import build_manifest
+import build_report
+import csv_loader
+import dataset
+import icons
+import ics_feed
+import image_pipeline
+import image_probe
+import publish
+import search_index
+import service_worker
+import templates
+import watch
 #______________________________________________________________________________
 #calendar content generator
-def update_calendar_content():
-    # Read the original file
-    with open("pages_py/calender.html", "r") as original:
-        content = original.read()
-        
-    # Find the split point
-    split_point = content.find("<!--Events-->")
-    if split_point == -1:
-        print("Could not find <!--Events--> comment marker")
-        return
-        
-    # Get header content
-    header_content = content[:split_point]
-
-    # Get content between end of events and event modals
-    end_events_idx = content.find("<!--End of Events-->")
-    event_modals_idx = content.find("<!--Event Modals-->")
-    if end_events_idx == -1 or event_modals_idx == -1:
-        print("Could not find event section comment markers")
-        return
-    between_content = content[end_events_idx + len("<!--End of Events-->"):event_modals_idx]
-
-    # Get footer content
-    footer_idx = content.find("<!--Footer-->")
-    if footer_idx == -1:
-        print("Could not find footer comment marker")
-        return
-    footer_content = content[footer_idx:]
-
-    # Read events from CSV into pandas dataframe
-    events_df = pd.read_csv("../CSV_info/UpcomingEvents.csv")
-    # Convert the Date column to datetime and then format it as string
-    events_df['Date'] = pd.to_datetime(events_df['Date'], format='%d-%b-%Y')
-    # Filter for future events only
-    current_date = pd.Timestamp.now().normalize()
-    events_df = events_df[events_df['Date'] > current_date]
-    
-    # Sort events by date
-    events_df = events_df.sort_values('Date')
-    # Format the date as YYYY-MM-DD string for the calendar links
-    events_df['DateStr'] = events_df['Date'].dt.strftime('%B %d')
-    
-    # Initialize empty strings to store HTML
-    cards_html = ""
-    modals_html = ""
-    
-    # Iterate through events and generate HTML
+CALENDAR_PAGE = "pages_py/calender.html"
+# Archive pages of each academic term's past events, built with --archive
+CALENDAR_TERM_PAGE = "pages_py/calender-{term}.html"
+
+def update_calendar_content(sharded=False, terms=None):
+    # Parse the marker regions of the original file
+    template = templates.load(CALENDAR_PAGE)
+    missing = template.missing("Events", "Event Modals")
+    if missing:
+        print(f"Could not find {', '.join(missing)} comment markers")
+        return False
+
+    # Every event goes in the .ics feed, sorted by date; the page keeps future events only.
+    # With --archive, the events the term pages list keep their .ics files after they leave the CSV
+    data = dataset.current()
+    with build_report.stage("render"):
+        archived = [event for events in data.past_event_terms.values() for event in events] if terms else ()
+        ics_feed.write_calendar_files(data.events, csv_loader.UPCOMING_EVENTS_CSV, archived)
+    events = data.future_events()
+
+    # With --archive the upcoming events link to each term's past events
+    nav = [calendar_term_nav(CALENDAR_PAGE, terms)] if terms else []
+    remove_term_pages(CALENDAR_TERM_PAGE, keep=terms or ())
+    if sharded:
+        with build_report.stage("render"):
+            return write_sharded_calendar(template, events, nav)
+
+    # Collect HTML fragments and join them once when writing
+    cards_html = []
+    modals_html = []
+    with build_report.stage("render"):
+        for fragment, is_modal in render_calendar_events(events):
+            (modals_html if is_modal else cards_html).append(fragment)
+        html = template.render({
+            "Events": ["\n", *nav, *cards_html, "\n"],
+            "Event Modals": ["\n", icons.sprite(CALENDAR_ICONS), *modals_html],
+        })
+
+    # Write the events section if it changed
+    templates.write_if_changed(CALENDAR_PAGE, html)
+    return True
+
+def update_calendar_term(term, terms):
+    """Write the archive page of one academic term's past events, kept in the archive store after they leave the CSV"""
+    template = templates.load(CALENDAR_PAGE)
+    missing = template.missing("Events", "Event Modals")
+    if missing:
+        print(f"Could not find {', '.join(missing)} comment markers")
+        return False
+
+    page = CALENDAR_TERM_PAGE.format(term=term)
+    cards_html = []
+    modals_html = []
+    with build_report.stage("render"):
+        # Oldest first, the same order as the upcoming calendar
+        for fragment, is_modal in render_calendar_events(dataset.current().past_event_terms[term]):
+            (modals_html if is_modal else cards_html).append(fragment)
+        html = template.render({
+            "Events": ["\n", calendar_term_nav(page, terms), *cards_html, "\n"],
+            "Event Modals": ["\n", icons.sprite(CALENDAR_ICONS), *modals_html],
+        })
+    templates.write_if_changed(page, html)
+    return True
+
+def calendar_term_nav(current, terms):
+    return generate_term_nav([("Upcoming", CALENDAR_PAGE)] + [(f"20{term}", CALENDAR_TERM_PAGE.format(term=term)) for term in terms], current)
+
+def render_calendar_events(events):
+    """Yield (fragment, is_modal) pairs for every event, with a header before each new month"""
     current_month = None
-    for idx, row in events_df.iterrows():
-        event_num = idx + 1
+    for event_num, (event, occurrence) in enumerate(ics_feed.occurrences(events), start=1):
         # Extract month and year from the Date
-        event_date = row['Date']
-        month_year = event_date.strftime('%B %Y')
-        
+        month_year = event.date.strftime('%B %Y')
+
         # Add month header if it's a new month
         if month_year != current_month:
             current_month = month_year
-            cards_html += f'<h4 id="today" class="text-white mx-2" style="font-weight: bold;">{month_year}</h4>\n\n'
-            
+            yield f'<h4 id="today" class="text-white mx-2" style="font-weight: bold;">{month_year}</h4>\n\n', False
+
         card_html, modal_html = generate_event_html(
             event_num,
-            row['Name'],
-            row['DateStr'],  # Use the formatted date string here
-            row['Kind'], 
-            row['Time'],
-            row['Location'],
-            row['Description']
+            event.name,
+            event.date.strftime('%B %d'),  # Use the formatted date string here
+            event.kind,
+            event.time,
+            event.location,
+            event.description,
+            generate_calendar_links(event, occurrence)
         )
-        
-        cards_html += card_html + "\n\n"  # Add newlines between cards
-        modals_html += modal_html + "\n\n"  # Add newlines between modals
-
-    # Write the events section
-    with open("pages_py/calender.html", "w") as calendar_file:
-        calendar_file.write(header_content)
-        calendar_file.write("<!--Events-->\n")
-        calendar_file.write(cards_html)
-        calendar_file.write("\n<!--End of Events-->")
-        calendar_file.write(between_content)
-        calendar_file.write("<!--Event Modals-->\n")
-        calendar_file.write(modals_html)
-        calendar_file.write(footer_content)
-
-def generate_event_html(event_num, name, date, kind, time, location, description):
-    # Generate the event card HTML
-    card_html = f'''
+
+        yield card_html + "\n\n", False  # Add newlines between cards
+        yield modal_html + "\n\n", True  # Add newlines between modals
+
+# Icons on the calendar cards and modals, drawn from one sprite per page instead of repeating their paths
+CALENDAR_ICONS = ["clock-badge", "clock", "map-pin"]
+CARD_CLOCK_ICON = icons.use("clock-badge", 'width="15" height="15"')
+MODAL_CLOCK_ICON = icons.use("clock", 'class="small-icon"')
+MODAL_PIN_ICON = icons.use("map-pin", 'class="small-icon"')
+
+def generate_event_card(name, date, kind, modal_attributes):
+    # Generate the event card HTML; modal_attributes say which modal its buttons open
+    return f'''
         <div class="row rounded-3 bg-white my-4 py-3 px-2 align-middle">
             <div class="col-sm-8 rounded-3 align-middle">
               <p class="text-uppercase sase-blue-text">{kind}</p>
               <h5 style="font-weight: bold; margin-top: -13px;">{name}</h5>
-              <button type="button" class="btn bg-body-tertiary rounded-pill" data-bs-toggle="modal" data-bs-target="#event{event_num}Modal" style="font-size: small;">
-                <svg xmlns="http://www.w3.org/2000/svg" x="0px" y="0px" width="15" height="15" viewBox="0,15,256,256">
-                  <g fill="#000000" fill-rule="nonzero" stroke="none" stroke-width="1" stroke-linecap="butt" stroke-linejoin="miter" stroke-miterlimit="10" stroke-dasharray="" stroke-dashoffset="0" font-family="none" font-weight="none" font-size="none" text-anchor="none" style="mix-blend-mode: normal"><g transform="scale(8.53333,8.53333)"><path d="M15,3c-6.627,0 -12,5.373 -12,12c0,6.627 5.373,12 12,12c6.627,0 12,-5.373 12,-12c0,-6.627 -5.373,-12 -12,-12zM16,16h-8.005c-0.55,0 -0.995,-0.445 -0.995,-0.995v-0.011c0,-0.549 0.445,-0.994 0.995,-0.994h6.005v-8.005c0,-0.55 0.445,-0.995 0.995,-0.995h0.011c0.549,0 0.994,0.445 0.994,0.995z"></path></g></g>
-                </svg>   {date}
+              <button type="button" class="btn bg-body-tertiary rounded-pill" data-bs-toggle="modal" {modal_attributes} style="font-size: small;">
+                {CARD_CLOCK_ICON}   {date}
               </button>
             </div>
             <div class="col-sm-4 rounded-3 d-flex align-items-center justify-content-end">
-              <button type="button" class="btn btn-primary text-uppercase" data-bs-toggle="modal" data-bs-target="#event{event_num}Modal">
+              <button type="button" class="btn btn-primary text-uppercase" data-bs-toggle="modal" {modal_attributes}>
                 Get Details
               </button>
             </div>
         </div>'''
 
+def generate_calendar_links(event, occurrence=0):
+    # Google and Outlook "add to calendar" links plus the event's own .ics file
+    return ics_feed.google_link(event), ics_feed.event_url(event, occurrence), ics_feed.outlook_link(event)
+
+def generate_event_html(event_num, name, date, kind, time, location, description, calendar_links):
+    card_html = generate_event_card(name, date, kind, f'data-bs-target="#event{event_num}Modal"')
+    google_link, ics_link, outlook_link = calendar_links
+
     # Generate the modal HTML
     modal_html = f'''
     <div class="modal fade" id="event{event_num}Modal" tabindex="-1" aria-labelledby="event{event_num}ModalLabel" aria-hidden="true">
@@ -120,13 +168,14 @@ def generate_event_html(event_num, name, date, kind, time, location, description
           </div>
           <div class="modal-body">
             <p>{description}</p>
-            <p class="text-uppercase"><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 30 512 512" class="small-icon"><path d="M256 0a256 256 0 1 1 0 512A256 256 0 1 1 256 0zM232 120V256c0 8 4 15.5 10.7 20l96 64c11 7.4 25.9 4.4 33.3-6.7s4.4-25.9-6.7-33.3L280 243.2V120c0-13.3-10.7-24-24-24s-24 10.7-24 24z"/></svg>   When</p>
+            <p class="text-uppercase">{MODAL_CLOCK_ICON}   When</p>
             <p class="event-descript">{date} @ {time}</p>
-            <p class="text-uppercase"><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 384 512" class="small-icon"><path d="M215.7 499.2C267 435 384 279.4 384 192C384 86 298 0 192 0S0 86 0 192c0 87.4 117 243 168.3 307.2c12.3 15.3 35.1 15.3 47.4 0zM192 128a64 64 0 1 1 0 128 64 64 0 1 1 0-128z"/></svg>  Where</p>
+            <p class="text-uppercase">{MODAL_PIN_ICON}  Where</p>
             <p class="event-descript">{location}</p>
-            <p class="sase-blue-text"><a href="https://calendar.google.com/calendar/render?action=TEMPLATE&text={name.replace(' ', '+')}&details={description.replace(' ', '+')}&dates={date.replace('-', '')}T{time[:2]}{time[3:5]}00/{date.replace('-', '')}T{time[-8:-6]}{time[-5:-3]}00&location={location.replace(' ', '+')}">Add to Google Calendar</a></p>
-            <p><a href="data:text/calendar;charset=utf8,BEGIN:VCALENDAR%0AVERSION:2.0%0ABEGIN:VEVENT%0ADTSTART:{date.replace('-', '')}T{time[:2]}{time[3:5]}00%0ADTEND:{date.replace('-', '')}T{time[-8:-6]}{time[-5:-3]}00%0ASUMMARY:{name}%0ADESCRIPTION:{description}%0ALOCATION:{location}%0AEND:VEVENT%0AEND:VCALENDAR">Add to Apple Calendar</a></p>
-            <p><a href="https://outlook.office.com/calendar/0/deeplink/compose?subject={name.replace(' ', '+')}&body={description.replace(' ', '+')}&startdt={date}T{time[:5]}:00+00:00&enddt={date}T{time[-8:]}+00:00&location={location.replace(' ', '+')}&path=%2Fcalendar%2Faction%2Fcompose&rru=addevent">Add to Outlook Calender</a></p>
+            <p class="sase-blue-text"><a href="{google_link}">Add to Google Calendar</a></p>
+            <p><a href="{ics_link}">Add to Apple Calendar</a></p>
+            <p><a href="{outlook_link}">Add to Outlook Calender</a></p>
+            <p><a href="{ics_feed.FEED_URL}">Subscribe to all SASE events</a></p>
           </div>
           <div class="modal-footer">
             <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Close</button>
@@ -137,83 +186,212 @@ def generate_event_html(event_num, name, date, kind, time, location, description
 
     return card_html, modal_html
 
+# Month shards of event details for the sharded calendar, and the URL calender.html fetches them from
+CALENDAR_SHARD_DIR = "pages_py/calendar"
+CALENDAR_SHARD_URL = "calendar"
+
+# The one modal the sharded calendar fills in from a shard when a card is opened
+CALENDAR_MODAL_HTML = f'''
+    <div class="modal fade" id="eventModal" tabindex="-1" aria-labelledby="eventModalLabel" aria-hidden="true" data-shard-url="{CALENDAR_SHARD_URL}">
+      <div class="modal-dialog">
+        <div class="modal-content">
+          <div class="modal-header">
+            <div class="text-center w-100">
+              <p class="text-uppercase sase-blue-text" data-field="kind"></p>
+              <h1 class="modal-title fs-4" id="eventModalLabel" data-field="name" style="font-weight: bold; margin-top: -13px;"></h1>
+            </div>
+            <button type="button" class="btn-close" data-bs-dismiss="modal" aria-label="Close"></button>
+          </div>
+          <div class="modal-body">
+            <p data-field="description"></p>
+            <p class="text-uppercase">{MODAL_CLOCK_ICON}   When</p>
+            <p class="event-descript" data-field="when"></p>
+            <p class="text-uppercase">{MODAL_PIN_ICON}  Where</p>
+            <p class="event-descript" data-field="location"></p>
+            <p class="sase-blue-text"><a data-link="google">Add to Google Calendar</a></p>
+            <p><a data-link="ics">Add to Apple Calendar</a></p>
+            <p><a data-link="outlook">Add to Outlook Calender</a></p>
+            <p><a href="{ics_feed.FEED_URL}">Subscribe to all SASE events</a></p>
+          </div>
+          <div class="modal-footer">
+            <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Close</button>
+          </div>
+        </div>
+      </div>
+    </div>
+    <script src="../bootstrap-5.3.3-dist/js/CalendarModal.js"></script>
+
+'''
+
+def write_sharded_calendar(template, events, nav=()):
+    """Write one card list per month into calender.html and each month's event details to a JSON shard loaded on demand"""
+    cards_html = []
+    shards = {}
+    for month, month_events in itertools.groupby(events, key=lambda event: event.date.strftime('%Y-%m')):
+        month_events = list(month_events)
+        cards_html.append(f'<section class="calendar-month" id="month-{month}">\n')
+        cards_html.append(f'<h4 class="text-white mx-2" style="font-weight: bold;">{month_events[0].date.strftime("%B %Y")}</h4>\n\n')
+        shard = []
+        # A month holds every event of its dates, so repeats are counted the same as in the feed
+        for event_idx, (event, occurrence) in enumerate(ics_feed.occurrences(month_events)):
+            date = event.date.strftime('%B %d')
+            modal_attributes = f'data-bs-target="#eventModal" data-month="{month}" data-event="{event_idx}"'
+            cards_html.append(generate_event_card(event.name, date, event.kind, modal_attributes) + "\n\n")
+            google_link, ics_link, outlook_link = generate_calendar_links(event, occurrence)
+            shard.append({"name": event.name, "kind": event.kind, "when": f"{date} @ {event.time}", "location": event.location,
+                          "description": event.description, "google": google_link, "ics": ics_link, "outlook": outlook_link})
+        cards_html.append('</section>\n')
+        shards[month] = shard
+
+    os.makedirs(CALENDAR_SHARD_DIR, exist_ok=True)
+    for month, shard in shards.items():
+        templates.write_if_changed(f"{CALENDAR_SHARD_DIR}/{month}.json", json.dumps(shard, ensure_ascii=False, separators=(",", ":")))
+    # Drop shards for months that no longer have events
+    for name in os.listdir(CALENDAR_SHARD_DIR):
+        if name.endswith(".json") and name[:-len(".json")] not in shards:
+            os.remove(f"{CALENDAR_SHARD_DIR}/{name}")
+
+    templates.write_if_changed(CALENDAR_PAGE, template.render({
+        "Events": ["\n", *nav, *cards_html, "\n"],
+        "Event Modals": ["\n", icons.sprite(CALENDAR_ICONS), CALENDAR_MODAL_HTML],
+    }))
+    return True
+
 #______________________________________________________________________________
 #meetTeam content generator
-def update_meetTeam_content():
-    # Read the meetTeam.html file
-    with open('pages_py/meetTeam.html', 'r') as file:
-        content = file.read()
-
-    # Find the Eboard comment boundaries
-    split_point = content.find("<!--EBoard-->")
-    if split_point == -1:
-        print("Could not find <!--Eboard--> comment marker")
-        return
-        
-    # Get header content
-    header_content = content[:split_point + len("<!--EBoard-->")]
-
-    footer_idx = content.find("<!--End of EBoard-->")
-    if footer_idx == -1:
-        print("Could not find end of EBoard comment marker")
-        return
-    footer_content = content[footer_idx:]
-
-    # Read the Eboard CSV into a pandas dataframe
-    eboard_df = pd.read_csv("../CSV_info/CurrentBoard.csv")
-    # Initialize empty string to store all card HTML
-    eboard_cards = ""
-    
+MEET_TEAM_PAGE = "pages_py/meetTeam.html"
+# Archive pages of every term's board, and the EBoard<yy-yy> image folder each one's photos are in
+MEET_TEAM_TERM_PAGE = "pages_py/meetTeam-{term}.html"
+EBOARD_IMAGE_DIR = "../images/EBoard"
+EBOARD_TERM_DIR = f"{EBOARD_IMAGE_DIR}/EBoard{{term}}"
+TERM_RE = re.compile(r"\d{2}-\d{2}")
+# Photos of a term without a board CSV are named First_Last
+PHOTO_NAME_RE = re.compile(r"([A-Z][A-Za-z'-]*)_([A-Z][A-Za-z'-]*)")
+
+def update_meetTeam_content(term=None, terms=None):
+    """Write meetTeam.html for the current board, or the archive page of term's board; terms lists every term for the nav"""
+    # Parse the marker regions of the meetTeam.html file
+    template = templates.load(MEET_TEAM_PAGE)
+    if template.missing("EBoard"):
+        print("Could not find <!--EBoard--> comment markers")
+        return False
+
+    data = dataset.current()
+    current_term = dataset.term(data.today)
+    term = term or current_term
+    # Read the Eboard CSV, or list the term's photos when only those were kept
+    board_members = data.board_for(term)
+    if board_members is None:
+        board_members = photo_board(term)
+
+    # The current term's board is meetTeam.html itself
+    page = MEET_TEAM_PAGE if term == current_term else MEET_TEAM_TERM_PAGE.format(term=term)
+    nav = []
+    if terms:
+        nav.append(generate_term_nav([(f"20{other}", MEET_TEAM_PAGE if other == current_term else MEET_TEAM_TERM_PAGE.format(term=other))
+                                      for other in terms], page, nav_class="col-12"))
+    with build_report.stage("render"):
+        html = template.render({"EBoard": [*nav, *render_eboard_cards(board_members, term)]})
+
+    # Write the cards to the page if they changed
+    templates.write_if_changed(page, html)
+    if page == MEET_TEAM_PAGE:
+        remove_term_pages(MEET_TEAM_TERM_PAGE, keep=terms or ())
+    return True
+
+def photo_board(term):
+    # A member per First_Last photo in the term's image folder; other names and second copies of a photo are skipped
+    image_dir = EBOARD_TERM_DIR.format(term=term)
+    entry = asset_index.directory_entry(image_dir)
+    known = {member.name for member in dataset.current().board}
+    kept = []
+    for name, size, _ in entry["images"] if entry else []:
+        path = f"{image_dir}/{name}"
+        match = PHOTO_NAME_RE.fullmatch(name.rsplit(".", 1)[0])
+        if match is None:
+            print(f"Skipping {path}: not named First_Last")
+            continue
+        member_name = " ".join(match.groups())
+        # Only photos of the same size are compared byte for byte
+        same = next((i for i, (_, other, other_size) in enumerate(kept)
+                     if other_size == size and filecmp.cmp(other, path, shallow=False)), None)
+        if same is None:
+            kept.append((member_name, path, size))
+        elif member_name in known and kept[same][0] not in known:
+            # The same photo under two names: keep the spelling the board CSV uses
+            print(f"Skipping {kept[same][1]}: same photo as {path}")
+            kept[same] = (member_name, path, size)
+        else:
+            print(f"Skipping {path}: same photo as {kept[same][1]}")
+    return [csv_loader.BoardMember("", member_name, "", "", "", "") for member_name, _, _ in kept]
+
+def generate_term_nav(pages, current, nav_class="container my-3"):
+    # Pills linking each (label, page), the current page highlighted
+    links = []
+    for label, page in pages:
+        state = ' active" aria-current="page' if page == current else ''
+        links.append(f'        <li class="nav-item"><a class="nav-link{state}" href="{os.path.basename(page)}">{label}</a></li>\n')
+    return (f'\n    <nav class="{nav_class}" aria-label="Terms">\n'
+            '      <ul class="nav nav-pills justify-content-center flex-wrap">\n'
+            f'{"".join(links)}'
+            '      </ul>\n'
+            '    </nav>\n')
+
+def remove_term_pages(page_format, keep):
+    # Drop archive pages of terms no longer found, or all of them outside --archive
+    page_dir = os.path.dirname(page_format)
+    prefix, suffix = os.path.basename(page_format).split("{term}")
+    for name in os.listdir(page_dir):
+        term = name[len(prefix):-len(suffix)]
+        if name.startswith(prefix) and name.endswith(suffix) and TERM_RE.fullmatch(term) and term not in keep:
+            os.remove(os.path.join(page_dir, name))
+
+def render_eboard_cards(board_members, term):
     # Track current position to add position header comments
     current_position = ""
-    
+    # Count co-officers per position prefix to give each card a unique ID
+    co_counts = collections.Counter()
+
     # Generate card for each board member
-    for _, row in eboard_df.iterrows():
+    for member in board_members:
         # Extract position without Co- prefix for grouping
-        base_position = row['Position'].replace('Co-', '')
-        
+        base_position = member.position.replace('Co-', '')
+
         # Add position header comment if new position group
-        if base_position != current_position:
-            eboard_cards += f"\n          <!-- {base_position}(s) -->\n"
+        if base_position and base_position != current_position:
+            yield f"\n          <!-- {base_position}(s) -->\n"
             current_position = base_position
-            
+
         # Generate unique card ID based on position
-        if row['Position'].startswith('Co-'):
+        if member.position.startswith('Co-'):
             position_prefix = base_position.lower().replace(' ', '')[:4]
-            card_id = f"{position_prefix}{len(eboard_cards.split(position_prefix)) + 1}"
+            co_counts[position_prefix] += 1
+            card_id = f"{position_prefix}{co_counts[position_prefix]}"
         else:
             card_id = base_position.lower().replace(' ', '')
-            
+
         # Generate card HTML
-        card = generate_eboard_card(
-            position=row['Position'],
-            name=row['Name'], 
-            major=row['Major'],
-            email=row['Email'],
-            year=row['Year'],
-            linkedin=row['LinkedIn'],
-            card_id=card_id
+        yield generate_eboard_card(
+            position=member.position,
+            name=member.name,
+            major=member.major,
+            email=member.email,
+            year=member.year,
+            linkedin=member.linkedin,
+            card_id=card_id,
+            term=term
         )
-        
-        eboard_cards += card
-
-    # Write the updated content to the meetTeam.html file
-    with open('pages_py/meetTeam.html', 'w') as file:
-        file.write(header_content)
-        file.write(eboard_cards)
-        file.write(footer_content)
-
-def generate_eboard_card(position, name, major, email, year, linkedin, card_id):
-    # Get current year and create image path string
-    current_year = datetime.datetime.now().year
-    image_path = f"../images/EBoard/EBoard{str(current_year)[-2:]}-{str(current_year + 1)[-2:]}/{name.split()[0]}_{name.split()[1]}.png"
-    card_html = f'''          <div class="col-md-4 col-lg-3">
-            <div class="card">
-              <img src="{image_path}" class="card-img-top" alt="...">
-              <div class="card-body">
-                <h2 class="card-title text-center fw-bold">{position}</h2>
-                <h5 class="card-title text-center">{name}</h5>
-                <div class="text-center">
+
+def generate_eboard_card(position, name, major, email, year, linkedin, card_id, term=None):
+    # The photo is First_Last in the term's EBoard<yy-yy> folder, whatever its extension
+    term = term or dataset.term(datetime.date.today())
+    image_dir = EBOARD_TERM_DIR.format(term=term)
+    stem = "_".join(name.split()[:2])
+    image_name = next((image for image in asset_index.images(image_dir) if image.rsplit(".", 1)[0] == stem), f"{stem}.png")
+    image_path = f"{image_dir}/{image_name}"
+
+    # Members known only from an archived term's photos have nothing to show under About
+    about_html = f'''                <div class="text-center">
                   <button class="btn sase-blue text-white my-2" type="button" data-bs-toggle="collapse" data-bs-target="#{card_id}-info" aria-expanded="false" aria-controls="{card_id}-info">
                     About
                   </button>
@@ -227,7 +405,14 @@ def generate_eboard_card(position, name, major, email, year, linkedin, card_id):
                       Linkedin: <a href="{linkedin}" target="_blank">Connect</a></p>
                   </div>
                 </div>
-              </div>
+''' if major or email or year or linkedin else ""
+    card_html = f'''          <div class="col-md-4 col-lg-3">
+            <div class="card">
+              {image_pipeline.picture(image_path, image_path, 'class="card-img-top" alt="..."', image_pipeline.EBOARD_SIZES)}
+              <div class="card-body">
+                <h2 class="card-title text-center fw-bold">{position}</h2>
+                <h5 class="card-title text-center">{name}</h5>
+{about_html}              </div>
             </div>
           </div>\n\n'''
     return card_html
@@ -235,119 +420,66 @@ def generate_eboard_card(position, name, major, email, year, linkedin, card_id):
 #______________________________________________________________________________
 #index content generator
 def update_index_content():
-    # Read the original file
-    with open("index.html", "r") as original:
-        content = original.read()
-        
-    # Find the split point
-    split_point = content.find("<!--Carousel -->")
-    if split_point == -1:
-        print("Could not find <!--Carousel --> comment marker")
-        return
-        
-    # Get header content
-    header_content = content[:split_point]
-
-    # Get content between end of events and event modals
-    end_events_idx = content.find("<!--Navigation Bar-->")
-    event_modals_idx = content.find("<!-- Announcements-->")
-    if end_events_idx == -1 or event_modals_idx == -1:
-        print("Could not find navigation or announcements comment markers")
-        return
-    between_content1 = "\n\n\t\t" + content[end_events_idx:event_modals_idx + len("<!-- Announcements-->")] + "\n"
-
-    # Get content between end of events and event modals
-    end_events_idx = content.find("<!-- End of Announcements-->")
-    event_modals_idx = content.find("<!-- Sneek Peak at Events -->")
-    if end_events_idx == -1 or event_modals_idx == -1:
-        print("Could not find announcements or events preview comment markers")
-        return
-    between_content2 = "\n\n\t\t" + content[end_events_idx:event_modals_idx + len("<!-- Sneek Peak at Events -->")] + "\n"
-
-    # Get footer content
-    footer_idx = content.find("<!-- End of Sneek Peak at Events -->")
-    if footer_idx == -1:
-        print("Could not find end of events preview comment marker")
-        return
-    footer_content = "\n\t\t\t" + content[footer_idx:]
-
-    # Get list of carousel images
-    carousel_images = []
+    # Parse the marker regions of the original file
+    template = templates.load("index.html")
+    missing = template.missing("Carousel", "Announcements", "Sneek Peak at Events")
+    if missing:
+        print(f"Could not find {', '.join(missing)} comment markers")
+        return False
+
+    # Get sorted list of carousel images from the asset index
     carousel_dir = "../images/Carousel"
-    if os.path.exists(carousel_dir):
-        carousel_images = [f for f in os.listdir(carousel_dir) if f.endswith(('.png', '.jpg', '.jpeg'))]
-    else:
+    carousel_images = asset_index.images(carousel_dir)
+    if asset_index.directory_entry(carousel_dir) is None:
         print(f"Directory {carousel_dir} not found")
 
     # Generate carousel HTML
-    carousel_html = "<!--Carousel -->\n" + generate_carousel(carousel_images)
-
-    # Process announcements data
-    announcements_df = pd.read_csv("../CSV_info/Announcements.csv")
-    announcements_df['Date'] = pd.to_datetime(announcements_df['Date'], format='%d-%b-%Y')
-    current_date = pd.Timestamp.now().normalize()
-    announcements_df = announcements_df[announcements_df['Date'] <= current_date]
-    announcements_df = announcements_df.sort_values('Date', ascending=False)
-    recent_announcements = announcements_df.head(2)
-    recent_announcements['Date'] = recent_announcements['Date'].dt.strftime('%B %d, %Y')
-    
-    # Generate HTML for announcements
-    announcements_html = ""
-    for _, row in recent_announcements.iterrows():  
-        announcements_html += generate_announcement_card(row['Name'], row['Date'], row['Description'], row['Image'], row['Link Button'], row['Link'])
+    with build_report.stage("render"):
+        carousel_html = generate_carousel(carousel_images)
 
-    # Process upcoming events data
+    # The two most recent announcements that are already out
+    data = dataset.current()
+    recent_announcements = data.recent_announcements(2)
+
+    # Generate HTML for announcements
+    with build_report.stage("render"):
+        announcements_html = [
+            generate_announcement_card(announcement.name, announcement.date.strftime('%B %d, %Y'), announcement.description,
+                                       announcement.image, announcement.link_button, announcement.link)
+            for announcement in recent_announcements
+        ]
+
+    # Get up to 3 of the soonest future events
     try:
-        events_df = pd.read_csv("../CSV_info/UpcomingEvents.csv")
-        events_df = events_df[['Name', 'Date', 'Description']]
+        future_events = data.future_events(3)
     except FileNotFoundError:
         print("Could not find CSV_info/UpcomingEvents.csv")
-        events_df = pd.DataFrame(columns=['Name', 'Date', 'Description'])
+        future_events = []
 
-    # Convert Date column to datetime
-    events_df['Date'] = pd.to_datetime(events_df['Date'], format='%d-%b-%Y')
-    
-    # Filter for future events
-    current_date = pd.Timestamp.now().normalize()
-    future_events = events_df[events_df['Date'] > current_date]
-    
-    # Sort by date and get up to 3 most recent future events
-    future_events = future_events.sort_values('Date').head(3)
-    
-    # Format dates for display
-    future_events['DateStr'] = future_events['Date'].dt.strftime('%B %d')
-    
     # Generate preview HTML for each event
-    event_previews_html = ""
-    
-    # If we have less than 3 future events, add placeholder events
-    num_events = len(future_events)
-    if num_events < 3:
-        # Add real events first
-        for _, row in future_events.iterrows():
-            event_previews_html += generate_event_preview(row['Name'], row['DateStr'], row['Description'])
-        
-        # Add placeholder events to make total of 3
-        for i in range(3 - num_events):
-            event_previews_html += generate_event_preview(
+    with build_report.stage("render"):
+        event_previews_html = [
+            generate_event_preview(event.name, event.date.strftime('%B %d'), event.description)
+            for event in future_events
+        ]
+
+        # If we have less than 3 future events, add placeholder events to make total of 3
+        for i in range(3 - len(event_previews_html)):
+            event_previews_html.append(generate_event_preview(
                 "TBD",
-                "X XX, XXXX", 
+                "X XX, XXXX",
                 "Check back in for more information on upcoming events"
-            )
-    else:
-        # Add all 3 events if we have enough
-        for _, row in future_events.iterrows():
-            event_previews_html += generate_event_preview(row['Name'], row['DateStr'], row['Description'])
-            
-    # Write the updated content to the index.html file
-    with open('index.html', 'w') as file:
-        file.write(header_content)
-        file.write(carousel_html)
-        file.write(between_content1)
-        file.write(announcements_html)  
-        file.write(between_content2)
-        file.write(event_previews_html)
-        file.write(footer_content)
+            ))
+
+        html = template.render({
+            "Carousel": ["\n", carousel_html, "\n\n\t\t"],
+            "Announcements": ["\n", *announcements_html, "\n\n\t\t"],
+            "Sneek Peak at Events": ["\n", *event_previews_html, "\n\t\t\t"],
+        })
+
+    # Write the updated content to the index.html file if it changed
+    templates.write_if_changed('index.html', html)
+    return True
 
 def generate_announcement_card(name, date, description, image, link_button, link):
     if link_button == "":
@@ -365,7 +497,7 @@ def generate_announcement_card(name, date, description, image, link_button, link
               <a href="{link}" target="_blank" class="btn btn-outline-light btn-lg my-2 rounded-0">{link_button}</a>
             </div>
             <div class="col-auto d-none d-lg-block">
-              <img class="announcement-pic" src="images/Announcements/{image}" alt="Announcement Image" class="w-100">
+              <img class="announcement-pic" src="images/Announcements/{image}" alt="Announcement Image" class="w-100"{image_pipeline.size_attributes(f"../images/Announcements/{image}")}>
             </div>
           </div>
         </div>''' + "\n"
@@ -375,7 +507,7 @@ def generate_carousel_item(image_name, is_active=False):
     caption = image_name.rsplit('.', 1)[0]
     
     return f'''        <div class="carousel-item{' active' if is_active else ''}">
-            <img src="images/Carousel/{image_name}" class="d-block w-100" alt="{caption}">
+            {image_pipeline.picture(f"../images/Carousel/{image_name}", f"images/Carousel/{image_name}", f'class="d-block w-100" alt="{caption}"', image_pipeline.CAROUSEL_SIZES)}
             <div class="carousel-caption d-none d-md-block">
               <div class="container-fluid bg-custom">
                 <h5>{caption}</h5>
@@ -384,16 +516,16 @@ def generate_carousel_item(image_name, is_active=False):
         </div>'''
 
 def generate_carousel(image_list):
-    carousel_html = '''    <div id="myCarousel" class="carousel slide mb-6" data-bs-ride="carousel">  
+    carousel_html = ['''    <div id="myCarousel" class="carousel slide mb-6" data-bs-ride="carousel">  
       <div class="carousel-inner">
-'''
-    
+''']
+
     # Generate carousel items
     for i, image in enumerate(image_list):
-        carousel_html += generate_carousel_item(image, is_active=(i==0))
-            
+        carousel_html.append(generate_carousel_item(image, is_active=(i==0)))
+
     # Add carousel controls
-    carousel_html += '''      </div>
+    carousel_html.append('''      </div>
       <button class="carousel-control-prev" type="button" data-bs-target="#myCarousel" data-bs-slide="prev">
         <span class="carousel-control-prev-icon" aria-hidden="true"></span>
         <span class="visually-hidden">Previous</span>
@@ -402,9 +534,9 @@ def generate_carousel(image_list):
         <span class="carousel-control-next-icon" aria-hidden="true"></span>
         <span class="visually-hidden">Next</span>
       </button>
-    </div>'''
-    
-    return carousel_html
+    </div>''')
+
+    return "".join(carousel_html)
 
 def generate_event_preview(name, date, description):
     return f'''            <div class="col-md-4 px-4">
@@ -416,111 +548,142 @@ def generate_event_preview(name, date, description):
 #______________________________________________________________________________
 #gallery content generator
 
-def update_gallery_content():
-    # Read the meetTeam.html file
-    with open('pages_py/gallery.html', 'r') as file:
-        content = file.read()
-
-    # Find the Eboard comment boundaries
-    split_point = content.find("<!--Events-->")
-    if split_point == -1:
-        print("Could not find <!--Events--> comment marker")
-        return
-        
-    # Get header content
-    header_content = content[:split_point + len("<!--Events-->")] + "\n"
-
-    footer_idx = content.find("<!--End of Events-->")
-    if footer_idx == -1:
-        print("Could not find end of events comment marker")
-        return
-    footer_content = "\n" + content[footer_idx:]
-
-    # Read events from CSV into pandas dataframe
-    # Read events from CSV and convert dates to datetime
-    gallery_events_df = pd.read_csv("../CSV_info/GalleryEvents.csv")
-    gallery_events_df['Date'] = pd.to_datetime(gallery_events_df['Date'])
-    
-    # Sort events by date descending (most recent first)
-    gallery_events_df = gallery_events_df.sort_values('Date', ascending=False)
-    
-    # Initialize empty string to store all row HTML
-    gallery_rows = ""
-    
-    # Group events by academic year and season
-    for year in gallery_events_df['Date'].dt.year.unique():
-        
-        # Get events for Autumn semester (Aug-Dec)
-        autumn_mask = (gallery_events_df['Date'].dt.year == year) & \
-                     (gallery_events_df['Date'].dt.month.between(8, 12))
-        autumn_events = gallery_events_df[autumn_mask]
-        
-        if not autumn_events.empty:
-            gallery_rows += f'''    <div class="container"></div>
+# In semesters mode gallery.html shows the newest semester and every other semester gets a page of its own
+GALLERY_PAGE = "pages_py/gallery.html"
+GALLERY_SEMESTER_PAGE = "pages_py/gallery-{season}-{year}.html"
+# Archive pages of each academic term's semesters, built with --archive
+GALLERY_TERM_PAGE = "pages_py/gallery-{term}.html"
+SEMESTER_RE = re.compile(r"[a-z]+-\d{4}")
+
+def update_gallery_content(paged=False, terms=None):
+    # Parse the marker regions of the gallery.html file
+    template = templates.load(GALLERY_PAGE)
+    if template.missing("Events"):
+        print("Could not find <!--Events--> comment markers")
+        return False
+
+    # Events grouped by semester, most recent first
+    semesters = dataset.current().gallery_semesters
+
+    remove_term_pages(GALLERY_TERM_PAGE, keep=terms or ())
+    if paged:
+        return write_semester_galleries(template, semesters)
+
+    # With --archive the full gallery links to each term's page
+    nav = [generate_term_nav([("All", GALLERY_PAGE)] + [(f"20{term}", GALLERY_TERM_PAGE.format(term=term)) for term in terms], GALLERY_PAGE)] if terms else []
+    with build_report.stage("render"):
+        html = template.render({"Events": ["\n", *nav, *render_gallery_rows(semesters), "\n"]})
+
+    # Write the rows to the gallery.html file if they changed
+    templates.write_if_changed(GALLERY_PAGE, html)
+    remove_semester_pages(keep=set())
+    return True
+
+def update_gallery_term(term, terms):
+    """Write the archive page of one academic term's gallery events, with pills to every other term"""
+    template = templates.load(GALLERY_PAGE)
+    if template.missing("Events"):
+        print("Could not find <!--Events--> comment markers")
+        return False
+
+    page = GALLERY_TERM_PAGE.format(term=term)
+    nav = generate_term_nav([("All", GALLERY_PAGE)] + [(f"20{other}", GALLERY_TERM_PAGE.format(term=other)) for other in terms], page)
+    with build_report.stage("render"):
+        html = template.render({"Events": ["\n", nav, *render_gallery_rows(dataset.current().gallery_terms[term]), "\n"]})
+    templates.write_if_changed(page, html)
+    return True
+
+def gallery_page(season, year):
+    """The page a semester is on in semesters mode, relative to pages_py/ (and so to the site root)"""
+    newest = dataset.current().gallery_semesters[0]
+    if (season, year) == newest[:2]:
+        return GALLERY_PAGE
+    return GALLERY_SEMESTER_PAGE.format(season=season.lower(), year=year)
+
+def generate_semester_nav(semesters, current):
+    # Pills linking every semester's page, the current one highlighted
+    links = []
+    for season, year, _ in semesters:
+        state = ' active" aria-current="page' if (season, year) == current else ''
+        links.append(f'        <li class="nav-item"><a class="nav-link{state}" href="{os.path.basename(gallery_page(season, year))}">{season} {year}</a></li>\n')
+    return ('    <nav class="container my-3" aria-label="Semesters">\n'
+            '      <ul class="nav nav-pills justify-content-center flex-wrap">\n'
+            f'{"".join(links)}'
+            '      </ul>\n'
+            '    </nav>\n')
+
+def write_semester_galleries(template, semesters):
+    """Write each semester's cards to its own page from the gallery template, so a visit only loads one semester"""
+    written = set()
+    for season, year, semester_events in semesters:
+        page = gallery_page(season, year)
+        with build_report.stage("render"):
+            html = template.render({"Events": [
+                "\n", generate_semester_nav(semesters, (season, year)),
+                *render_gallery_rows([(season, year, semester_events)]), "\n"]})
+        templates.write_if_changed(page, html)
+        written.add(os.path.basename(page))
+    remove_semester_pages(keep=written)
+    return True
+
+def semester_pages():
+    # Every semester page on disk, relative to pages_py/
+    page_dir = os.path.dirname(GALLERY_SEMESTER_PAGE)
+    prefix, suffix = os.path.basename(GALLERY_SEMESTER_PAGE).split("{season}-{year}")
+    return [os.path.join(page_dir, name) for name in sorted(os.listdir(page_dir))
+            if name.startswith(prefix) and name.endswith(suffix) and SEMESTER_RE.fullmatch(name[len(prefix):-len(suffix)])]
+
+def remove_semester_pages(keep):
+    # Drop pages of semesters that no longer have events, or all of them when the gallery is back on one page
+    for path in semester_pages():
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+
+def render_gallery_rows(semesters):
+    # One counter for the whole page so carousel IDs stay unique across semesters
+    card_counter = itertools.count(1)
+
+    # A heading and rows of up to 3 cards for each semester
+    for season, year, semester_events in semesters:
+        yield f'''    <div class="container"></div>
       <div class="break"></div>
-      <h1 class="fw-bold text-center sase-blue-text">Autumn {year}</h1>
+      <h1 class="fw-bold text-center sase-blue-text">{season} {year}</h1>
       <div class="break"></div>
     </div>\n'''
-            
-            for start_idx in range(0, len(autumn_events), 3):
-                gallery_rows += generate_gallery_row(autumn_events, start_idx)
-        
-        # Get events for Spring semester (Jan-May)
-        spring_mask = (gallery_events_df['Date'].dt.year == year) & \
-                     (gallery_events_df['Date'].dt.month.between(1, 5))
-        spring_events = gallery_events_df[spring_mask]
-        
-        if not spring_events.empty:
-            gallery_rows += f'''    <div class="container"></div>
-      <div class="break"></div>
-      <h1 class="fw-bold text-center sase-blue-text">Spring {year}</h1>
-      <div class="break"></div>
-    </div>\n'''
-            
-            for start_idx in range(0, len(spring_events), 3):
-                gallery_rows += generate_gallery_row(spring_events, start_idx)
-
-    # Write the updated content to the gallery.html file
-    with open('pages_py/gallery.html', 'w') as file:
-        file.write(header_content)
-        file.write(gallery_rows)
-        file.write(footer_content)
-
-def generate_gallery_row(events_df, start_idx):
-    """Generate a row of up to 3 event cards from the events dataframe starting at the given index"""
-    row_html = '''    <div class="row mb-3 mx-3">\n'''
-    
-    # Get up to 3 events for this row
-    row_events = events_df.iloc[start_idx:start_idx+3]
+
+        for start_idx in range(0, len(semester_events), 3):
+            yield generate_gallery_row(semester_events[start_idx:start_idx+3], card_counter)
+
+def generate_gallery_row(row_events, card_counter):
+    """Generate a row of up to 3 event cards, numbering each carousel from the shared counter"""
+    row_html = ['''    <div class="row mb-3 mx-3">\n''']
     
-    for i, (_, event) in enumerate(row_events.iterrows()):
-        event_num = start_idx + i + 1
+    for event in row_events:
+        event_num = next(card_counter)
         
         # Get list of images for this event's carousel
-        event_folder = f"images/event_post/{event['Name']}"
-        image_files = []
-        if os.path.exists(event_folder):
-            image_files = [f for f in os.listdir(event_folder) if f.endswith(('.jpg','.png','.jpeg'))]
+        event_folder = f"images/event_post/{event.name}"
+        image_files = asset_index.images(event_folder)
         
         # If no images found, use SASE logo
         if not image_files:
             image_files = ['sase_logo.png']
             event_folder = '../images'
             
-        card_html = f'''      <div class="col-sm-4 themed-grid-col">
+        row_html.append(f'''      <div class="col-sm-4 themed-grid-col">
         <div class="card">
           <div id="event{event_num}Carousel" class="carousel slide" data-bs-ride="carousel" data-bs-interval="5000">
-            <div class="carousel-inner">'''
+            <div class="carousel-inner">''')
             
-        # Add carousel items
+        # Add carousel items; only the first slide loads with the page, the rest wait behind a blurred placeholder
         for j, image in enumerate(image_files):
-            card_html += f'''
+            row_html.append(f'''
               <div class="carousel-item{' active' if j==0 else ''}">
-                <img class="d-block w-100 carousel-image" src="{event_folder}/{image}" alt="">
-              </div>'''
+                {image_pipeline.picture(f"{event_folder}/{image}", f"{event_folder}/{image}", 'class="d-block w-100 carousel-image" alt=""', image_pipeline.GALLERY_SIZES, lazy=j > 0)}
+              </div>''')
                 
         # Add carousel controls
-        card_html += f'''
+        row_html.append(f'''
             </div>
             <button class="carousel-control-prev" type="button" data-bs-target="#event{event_num}Carousel" data-bs-slide="prev">
               <span class="carousel-control-prev-icon" aria-hidden="true"></span>
@@ -532,23 +695,249 @@ def generate_gallery_row(events_df, start_idx):
             </button>
           </div>
           <div class="card-body">
-            <h5 class="card-title">{event['Name']}</h5>
-            <p class="text-secondary mb-2">{event['Date'].strftime('%B %d, %Y')}</p>
-            <p class="card-text">{event['Description']}</p>
+            <h5 class="card-title">{event.name}</h5>
+            <p class="text-secondary mb-2">{event.date.strftime('%B %d, %Y')}</p>
+            <p class="card-text">{event.description}</p>
           </div>
         </div>
-      </div>'''
+      </div>''')
         
-        row_html += card_html
-        
-    row_html += "    </div>\n"
-    return row_html
+    row_html.append("    </div>\n")
+    return "".join(row_html)
 
 #______________________________________________________________________________
 #main
-update_calendar_content()
-update_meetTeam_content()
-update_gallery_content()
-update_index_content()
-
 
+# Inputs of each page: CSVs, the template with its generated regions, scanned image folders and the date the filters depend on
+def archive_terms():
+    """(board, gallery, calendar) terms, newest first: boards from the board CSVs and EBoard<yy-yy> folders, the others from the events"""
+    board_terms = {dataset.term(datetime.date.today())}
+    entry = asset_index.directory_entry(EBOARD_IMAGE_DIR)
+    prefix = os.path.basename(EBOARD_TERM_DIR).split("{term}")[0]
+    for name in entry["subdirs"] if entry else []:
+        if name.startswith(prefix) and TERM_RE.fullmatch(name[len(prefix):]):
+            board_terms.add(name[len(prefix):])
+    prefix, suffix = os.path.basename(csv_loader.BOARD_TERM_CSV).split("{term}")
+    for name in os.listdir(csv_loader.CSV_DIR):
+        if name.startswith(prefix) and name.endswith(suffix) and TERM_RE.fullmatch(name[len(prefix):-len(suffix)]):
+            board_terms.add(name[len(prefix):-len(suffix)])
+    data = dataset.current()
+    return sorted(board_terms, reverse=True), list(data.gallery_terms), list(data.past_event_terms)
+
+def page_inputs(options=None):
+    options = options or {}
+    today = datetime.date.today()
+    calendar_mode = options.get("calendar_mode", "inline")
+    gallery_mode = options.get("gallery_mode", "single")
+    # --archive adds a meetTeam, a gallery and a past events page per academic term, and pills between them
+    board_terms, gallery_terms, calendar_terms = archive_terms() if options.get("archive") else (None, None, None)
+    pages = {
+        "calendar": (functools.partial(update_calendar_content, sharded=calendar_mode == "sharded", terms=calendar_terms), dict(
+            csv_files=[csv_loader.UPCOMING_EVENTS_CSV],
+            template=CALENDAR_PAGE,
+            regions=["Events", "Event Modals"],
+            options={"calendar_mode": calendar_mode, "terms": calendar_terms},
+            build_date=today.isoformat())),
+        "meetTeam": (functools.partial(update_meetTeam_content, terms=board_terms), dict(
+            csv_files=[csv_loader.CURRENT_BOARD_CSV],
+            template=MEET_TEAM_PAGE,
+            regions=["EBoard"],
+            image_dirs=[EBOARD_TERM_DIR.format(term=dataset.term(today))],
+            options={"terms": board_terms},
+            build_date=dataset.term(today))),
+        "gallery": (functools.partial(update_gallery_content, paged=gallery_mode == "semesters", terms=gallery_terms), dict(
+            csv_files=[csv_loader.GALLERY_EVENTS_CSV],
+            template=GALLERY_PAGE,
+            regions=["Events"],
+            image_dirs=["images/event_post"],
+            options={"gallery_mode": gallery_mode, "terms": gallery_terms})),
+        "index": (update_index_content, dict(
+            csv_files=[csv_loader.ANNOUNCEMENTS_CSV, csv_loader.UPCOMING_EVENTS_CSV],
+            template="index.html",
+            regions=["Carousel", "Announcements", "Sneek Peak at Events"],
+            image_dirs=["../images/Carousel"],
+            build_date=today.isoformat())),
+        # Not a page: the index Search.js queries, with no template of its own
+        "search": (functools.partial(search_index.write_search_index, gallery_page=gallery_page if gallery_mode == "semesters" else None), dict(
+            csv_files=[csv_loader.UPCOMING_EVENTS_CSV, csv_loader.GALLERY_EVENTS_CSV, csv_loader.ANNOUNCEMENTS_CSV],
+            build_date=today.isoformat(),
+            options={"gallery_mode": gallery_mode})),
+    }
+    # Archive pages are rendered from the main templates into their own output files
+    for term in board_terms or []:
+        if term != dataset.term(today):
+            pages[f"meetTeam-{term}"] = (functools.partial(update_meetTeam_content, term=term, terms=board_terms), dict(
+                csv_files=[csv_loader.BOARD_TERM_CSV.format(term=term)],
+                template=MEET_TEAM_PAGE,
+                output=MEET_TEAM_TERM_PAGE.format(term=term),
+                regions=["EBoard"],
+                image_dirs=[EBOARD_TERM_DIR.format(term=term)],
+                options={"terms": board_terms},
+                build_date=dataset.term(today)))
+    for term in gallery_terms or []:
+        pages[f"gallery-{term}"] = (functools.partial(update_gallery_term, term=term, terms=gallery_terms), dict(
+            csv_files=[csv_loader.GALLERY_EVENTS_CSV],
+            template=GALLERY_PAGE,
+            output=GALLERY_TERM_PAGE.format(term=term),
+            regions=["Events"],
+            image_dirs=["images/event_post"],
+            options={"terms": gallery_terms}))
+    for term in calendar_terms or []:
+        pages[f"calendar-{term}"] = (functools.partial(update_calendar_term, term=term, terms=calendar_terms), dict(
+            csv_files=[csv_loader.UPCOMING_EVENTS_CSV],
+            template=CALENDAR_PAGE,
+            output=CALENDAR_TERM_PAGE.format(term=term),
+            regions=["Events", "Event Modals"],
+            options={"terms": calendar_terms},
+            build_date=today.isoformat()))
+    return pages
+
+def page_outputs(options=None):
+    """Every file the calendar, meetTeam, gallery and index builders write, relative to pages_py/"""
+    outputs = [inputs.get("output", inputs["template"]) for _, inputs in page_inputs(options).values() if "template" in inputs]
+    outputs += semester_pages()
+    outputs.append(ics_feed.FEED_PATH)
+    for directory in (ics_feed.EVENT_DIR, CALENDAR_SHARD_DIR):
+        if os.path.isdir(directory):
+            outputs += [f"{directory}/{name}" for name in sorted(os.listdir(directory))]
+    return outputs
+
+def run_builder(builder):
+    # Run one page builder, returning (built, error, report section) so failures and timings can be reported together
+    build_report.begin_page()
+    try:
+        built, error = bool(builder()), None
+    except Exception as error:
+        built, error = False, f"{type(error).__name__}: {error}"
+    return built, error, build_report.end_page()
+
+def build_pages(targets=None, jobs=1, force=False, options=None):
+    """Build the stale pages among targets (default all) in a pool of jobs processes and return the list of errors"""
+    manifest = build_manifest.load_manifest()
+    pages = page_inputs(options)
+
+    # Changes to the generator itself invalidate every page
+    sources = [__file__, csv_loader.__file__, dataset.__file__, archive_store.__file__, icons.__file__, asset_index.__file__, templates.__file__, ics_feed.__file__, image_pipeline.__file__, image_probe.__file__, search_index.__file__, image_pipeline.VARIANTS_INDEX, image_probe.CACHE_PATH]
+    stale = {}
+    for page in targets or pages:
+        with build_report.stage("manifest"):
+            digest = build_manifest.page_digest(sources=sources, **pages[page][1])
+        # A page written somewhere other than its template is rebuilt if that file has gone
+        output = pages[page][1].get("output")
+        if not force and manifest.get(page) == digest and (output is None or os.path.exists(output)):
+            print(f"{page} is up to date")
+            build_report.record_page(page, build_report.new_section(), "up to date")
+        else:
+            stale[page] = digest
+
+    if jobs > 1 and len(stale) > 1:
+        # Load the CSVs once here so every forked worker starts from the same parsed dataset
+        try:
+            data = dataset.current()
+            data.board
+            data.gallery_semesters
+        except (OSError, ValueError):
+            pass
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+            futures = {page: pool.submit(run_builder, pages[page][0]) for page in stale}
+            results = {page: future.result() for page, future in futures.items()}
+    else:
+        results = {page: run_builder(pages[page][0]) for page in stale}
+
+    errors = []
+    for page, (built, error, section) in results.items():
+        build_report.record_page(page, section, "built" if built else "failed")
+        if built:
+            manifest[page] = stale[page]
+            print(f"Built {page}")
+        else:
+            manifest.pop(page, None)
+            errors.append(f"{page}: {error or 'builder reported a problem, see above'}")
+    build_manifest.save_manifest(manifest)
+
+    if errors:
+        print(f"{len(errors)} page(s) failed:")
+        for error in errors:
+            print(f"  {error}")
+    return errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the SASE site pages from CSV_info. Run from pages_py/.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--only", action="append", metavar="PAGE",
+                        help="build only this page, may be repeated (calendar, meetTeam, gallery, index, search; "
+                             "with --archive also calendar-<yy-yy>, meetTeam-<yy-yy> and gallery-<yy-yy>)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the inputs are unchanged, re-statting every indexed image")
+    parser.add_argument("--no-images", action="store_true", help="skip resizing images into responsive variants")
+    parser.add_argument("--watch", action="store_true", help="after building, rebuild affected pages on change and serve the site with live reload")
+    parser.add_argument("--port", type=int, default=8000, help="port for the --watch dev server (default: 8000)")
+    parser.add_argument("--calendar-mode", choices=["inline", "sharded"], default="inline",
+                        help="inline: a pre-rendered modal per event; sharded: month card lists with details loaded on demand")
+    parser.add_argument("--gallery-mode", choices=["single", "semesters"], default="single",
+                        help="single: every semester on gallery.html; semesters: the newest on gallery.html, one page per older semester")
+    parser.add_argument("--archive", action="store_true",
+                        help="also build meetTeam-<yy-yy>.html, gallery-<yy-yy>.html and calender-<yy-yy>.html for every academic term in the CSVs, image folders and event archive")
+    parser.add_argument("--optimize-assets", action="store_true",
+                        help="write minified pages and a purged, fingerprinted stylesheet to ../dist")
+    parser.add_argument("--publish", action="store_true",
+                        help=f"write .gz (and .br with brotli installed) copies of every text asset and a cache manifest to {publish.MANIFEST_PATH}")
+    parser.add_argument("--report", nargs="?", const=build_report.REPORT_PATH, metavar="PATH",
+                        help=f"write per-stage timings and I/O counters as JSON (default path: {build_report.REPORT_PATH})")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write a cProfile dump of the build to PATH; page builders then run in this process")
+    args = parser.parse_args(argv)
+    options = {"calendar_mode": args.calendar_mode, "gallery_mode": args.gallery_mode, "archive": args.archive}
+    # Worker processes would be invisible to the profiler
+    jobs = 1 if args.profile else max(args.jobs, 1)
+
+    start = time.perf_counter()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+
+    # Scan the image folders once for this run, then encode variants since the pages reference them
+    with build_report.stage("scan"):
+        # --force also re-stats files whose directory did not change, catching images overwritten in place
+        asset_index.refresh(restat=args.force)
+    # Archive targets depend on the terms found in the data and image folders, so --only is checked once they are scanned
+    pages = page_inputs(options)
+    unknown = [page for page in args.only or [] if page not in pages]
+    if unknown:
+        parser.error(f"unknown page(s) for --only: {', '.join(unknown)} (choose from {', '.join(pages)})")
+    # Read the dimensions of new or changed images from their headers
+    with build_report.stage("probe"):
+        image_probe.refresh()
+    if not args.no_images:
+        with build_report.stage("images"):
+            image_pipeline.build_variants(jobs=jobs)
+
+    errors = build_pages(targets=args.only, jobs=jobs, force=args.force, options=options)
+    if args.optimize_assets:
+        # Scan every page, not just the ones rebuilt, since they all share the stylesheet; semester pages included
+        with build_report.stage("assets"):
+            asset_pipeline.optimize_assets([path for path in page_outputs(options) if path.endswith(".html")])
+    # Hash what the host will serve, the optimized copies included, so returning visitors only download what changed
+    with build_report.stage("precache"):
+        if not service_worker.write_service_worker(page_outputs(options)):
+            errors.append("precache: a page loads a local file that does not exist, see above")
+    if args.publish:
+        # Last, so the compressed copies match everything the steps above wrote
+        with build_report.stage("publish"):
+            publish.publish(jobs=jobs)
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"Wrote profile to {args.profile}, view it with: python3 -m pstats {args.profile}")
+    if args.report:
+        build_report.write_report(args.report, seconds=time.perf_counter() - start, argv=sys.argv[1:] if argv is None else argv,
+                                  jobs=jobs, options=options, errors=errors)
+    if args.watch:
+        pages = page_inputs(options)
+        watch.watch({page: pages[page] for page in args.only or pages},
+                    functools.partial(build_pages, options=options), port=args.port)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+# Inline icons the generators repeat on a page: each is defined once as a <symbol> and every copy is a <use>
+# name -> (viewBox, symbol body)
+ICONS = {
+    "clock-badge": ("0 15 256 256",
+                    '<g fill="#000000" transform="scale(8.53333,8.53333)"><path d="M15,3c-6.627,0 -12,5.373 -12,12c0,6.627 5.373,12 12,12c6.627,0 12,-5.373 12,-12c0,-6.627 -5.373,-12 -12,-12zM16,16h-8.005c-0.55,0 -0.995,-0.445 -0.995,-0.995v-0.011c0,-0.549 0.445,-0.994 0.995,-0.994h6.005v-8.005c0,-0.55 0.445,-0.995 0.995,-0.995h0.011c0.549,0 0.994,0.445 0.994,0.995z"></path></g>'),
+    "clock": ("0 30 512 512",
+              '<path d="M256 0a256 256 0 1 1 0 512A256 256 0 1 1 256 0zM232 120V256c0 8 4 15.5 10.7 20l96 64c11 7.4 25.9 4.4 33.3-6.7s4.4-25.9-6.7-33.3L280 243.2V120c0-13.3-10.7-24-24-24s-24 10.7-24 24z"/>'),
+    "map-pin": ("0 0 384 512",
+                '<path d="M215.7 499.2C267 435 384 279.4 384 192C384 86 298 0 192 0S0 86 0 192c0 87.4 117 243 168.3 307.2c12.3 15.3 35.1 15.3 47.4 0zM192 128a64 64 0 1 1 0 128 64 64 0 1 1 0-128z"/>'),
+}
+
+def sprite(names):
+    """A hidden <svg> defining each named icon once, to go anywhere in the page's body"""
+    symbols = "".join(f'<symbol id="icon-{name}" viewBox="{ICONS[name][0]}">{ICONS[name][1]}</symbol>' for name in names)
+    return f'<svg xmlns="http://www.w3.org/2000/svg" style="display: none">{symbols}</svg>\n'
+
+def use(name, attributes=""):
+    """An <svg> drawing the named icon from the page's sprite; attributes size or style it"""
+    return f'<svg {attributes} aria-hidden="true"><use href="#icon-{name}"></use></svg>'
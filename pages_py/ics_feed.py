@@ -0,0 +1,188 @@
+import datetime
+import hashlib
+import os
+import re
+import urllib.parse
+import templates
+
+# Subscribable feed of every event plus one small file per event, relative to pages_py/
+FEED_PATH = "pages_py/events.ics"
+EVENT_DIR = "pages_py/ics"
+# URLs of the same files as seen from pages_py/calender.html
+FEED_URL = "events.ics"
+EVENT_URL = "ics"
+
+# Event times in the CSV are local to campus
+TIMEZONE = "America/New_York"
+PRODID = "-//SASE OSU//Site Generator//EN"
+DEFAULT_DURATION = datetime.timedelta(hours=1)
+
+TIME_RE = r"(\d{1,2})(?::(\d{2}))?\s*([AaPp]\.?[Mm]\.?)?"
+TIME_RANGE_RE = re.compile(rf"^\s*{TIME_RE}\s*(?:-|–|—|to)\s*{TIME_RE}\s*$")
+SINGLE_TIME_RE = re.compile(rf"^\s*{TIME_RE}\s*$")
+
+try:
+    from zoneinfo import ZoneInfo
+    _tz = ZoneInfo(TIMEZONE)
+except Exception:
+    # Without tz data, times stay floating (local to whoever opens them)
+    _tz = None
+
+#______________________________________________________________________________
+#time parsing
+def to_time(hour, minute, period):
+    hour = int(hour)
+    minute = int(minute or 0)
+    if period:
+        is_pm = period[0].lower() == "p"
+        if hour == 12:
+            hour = 12 if is_pm else 0
+        elif is_pm:
+            hour += 12
+    return datetime.time(hour % 24, minute)
+
+def parse_time_range(text):
+    """Parse strings like '6:00 - 8:00 PM', '8:00-10:00 PM' or '11 AM - 1 PM' into (start, end) times, or None"""
+    match = TIME_RANGE_RE.match(text or "")
+    if match:
+        start_hour, start_minute, start_period, end_hour, end_minute, end_period = match.groups()
+        end = to_time(end_hour, end_minute, end_period)
+        # A start without AM/PM shares the end's, unless that would put it after the end ('11:00 - 1:00 PM')
+        start = to_time(start_hour, start_minute, start_period or end_period)
+        if not start_period and end_period and start > end:
+            start = to_time(start_hour, start_minute, "AM" if end_period[0].lower() == "p" else "PM")
+        return start, end
+
+    match = SINGLE_TIME_RE.match(text or "")
+    if match:
+        start = to_time(*match.groups())
+        end = (datetime.datetime.combine(datetime.date.min, start) + DEFAULT_DURATION).time()
+        return start, end
+    return None
+
+def event_times(event):
+    """(start, end, all_day) for an event; start and end are dates for all-day events"""
+    times = parse_time_range(event.time)
+    if times is None:
+        return event.date, event.date + datetime.timedelta(days=1), True
+    start = datetime.datetime.combine(event.date, times[0], tzinfo=_tz)
+    end = datetime.datetime.combine(event.date, times[1], tzinfo=_tz)
+    if end <= start:
+        end += datetime.timedelta(days=1)
+    return start, end, False
+
+#______________________________________________________________________________
+#links
+def occurrences(events):
+    """Yield (event, occurrence) for events in date order, occurrence counting the earlier events with the same date and name"""
+    seen = {}
+    for event in events:
+        key = (event.date, event.name)
+        yield event, seen.get(key, 0)
+        seen[key] = seen.get(key, 0) + 1
+
+def event_slug(event, occurrence=0):
+    # The first event of a date and name keeps the plain slug, repeats are numbered from -2
+    name = re.sub(r"[^a-z0-9]+", "-", event.name.lower()).strip("-")
+    slug = f"{event.date.isoformat()}-{name or 'event'}"
+    return f"{slug}-{occurrence + 1}" if occurrence else slug
+
+def event_url(event, occurrence=0):
+    return f"{EVENT_URL}/{event_slug(event, occurrence)}.ics"
+
+def google_link(event):
+    start, end, all_day = event_times(event)
+    if all_day:
+        dates = f"{start:%Y%m%d}/{end:%Y%m%d}"
+    else:
+        dates = f"{start:%Y%m%dT%H%M%S}/{end:%Y%m%dT%H%M%S}"
+    query = {"action": "TEMPLATE", "text": event.name, "details": event.description, "dates": dates,
+             "location": event.location, "ctz": TIMEZONE}
+    return "https://calendar.google.com/calendar/render?" + urllib.parse.urlencode(query)
+
+def outlook_link(event):
+    start, end, all_day = event_times(event)
+    query = {"path": "/calendar/action/compose", "rru": "addevent", "subject": event.name, "body": event.description,
+             "startdt": start.isoformat(), "enddt": end.isoformat(), "location": event.location}
+    if all_day:
+        query["allday"] = "true"
+    return "https://outlook.office.com/calendar/0/deeplink/compose?" + urllib.parse.urlencode(query)
+
+#______________________________________________________________________________
+#iCalendar output
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def fold(line):
+    # Lines longer than 75 octets continue on the next line after a single space
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte character
+        while cut and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+def format_datetime(value):
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            return f":{value.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}"
+        return f":{value:%Y%m%dT%H%M%S}"
+    return f";VALUE=DATE:{value:%Y%m%d}"
+
+def vevent_lines(event, stamp, occurrence=0):
+    start, end, _ = event_times(event)
+    # Repeats of a date and name need UIDs of their own, or calendar clients merge them into one event
+    key = f"{event.date.isoformat()}|{event.name}" + (f"|{occurrence}" if occurrence else "")
+    uid = hashlib.sha1(key.encode()).hexdigest()
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@saseosu",
+        f"DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}",
+        f"DTSTART{format_datetime(start)}",
+        f"DTEND{format_datetime(end)}",
+        f"SUMMARY:{escape_text(event.name)}",
+        f"DESCRIPTION:{escape_text(event.description)}",
+        f"LOCATION:{escape_text(event.location)}",
+        f"CATEGORIES:{escape_text(event.kind)}",
+        "END:VEVENT",
+    ]
+
+def calendar_text(entries, stamp, name=None):
+    # entries are (event, occurrence) pairs, as occurrences() yields them
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH"]
+    if name:
+        lines.append(f"X-WR-CALNAME:{escape_text(name)}")
+        lines.append(f"X-WR-TIMEZONE:{TIMEZONE}")
+    for event, occurrence in entries:
+        lines.extend(vevent_lines(event, stamp, occurrence))
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(fold(line) for line in lines) + "\r\n"
+
+def write_calendar_files(events, source_path, archived=()):
+    """Write the events.ics feed and one .ics per event, stamped with the source CSV's mtime so unchanged data keeps its bytes;
+    archived events, oldest first, get their own .ics too but stay out of the feed"""
+    stamp = datetime.datetime.fromtimestamp(os.stat(source_path).st_mtime, datetime.timezone.utc)
+    entries = list(occurrences(events))
+    templates.write_if_changed(FEED_PATH, calendar_text(entries, stamp, name="SASE OSU Events"))
+
+    os.makedirs(EVENT_DIR, exist_ok=True)
+    written = set()
+    for event, occurrence in entries + list(occurrences(archived)):
+        slug = event_slug(event, occurrence)
+        if f"{slug}.ics" in written:
+            # Past events still in the CSV are in both lists
+            continue
+        written.add(f"{slug}.ics")
+        templates.write_if_changed(f"{EVENT_DIR}/{slug}.ics", calendar_text([(event, occurrence)], stamp))
+    # Drop files for events that are no longer in the CSV
+    for name in os.listdir(EVENT_DIR):
+        if name.endswith(".ics") and name not in written:
+            os.remove(f"{EVENT_DIR}/{name}")
@@ -0,0 +1,206 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+import posixpath
+import asset_index
+import image_probe
+
+# Source images the generators link to, relative to pages_py/
+SOURCE_DIRS = asset_index.ASSET_ROOTS
+SOURCE_FILES = ["../images/sase_logo.png"]
+
+# Resized copies are named after the hash of the source bytes, so unchanged photos are never re-encoded
+VARIANTS_DIR = "../images/responsive"
+VARIANTS_INDEX = f"{VARIANTS_DIR}/index.json"
+WIDTHS = (480, 960, 1600)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+# Tiny blurred copies inlined behind lazy images until the real one arrives
+PLACEHOLDER_WIDTH = 24
+PLACEHOLDER_BLUR = 1.5
+PLACEHOLDER_QUALITY = 40
+
+# sizes attribute for each place the generators put an image
+CAROUSEL_SIZES = "100vw"
+GALLERY_SIZES = "(min-width: 576px) 33vw, 100vw"
+EBOARD_SIZES = "(min-width: 992px) 25vw, (min-width: 768px) 33vw, 100vw"
+
+#______________________________________________________________________________
+#build stage
+def find_sources():
+    # (path, size, mtime_ns) for every source image; the names come from the asset index, but each file is
+    # stat'ed here since an image overwritten in place keeps its directory's mtime and so its index entry
+    paths = list(SOURCE_FILES)
+    for source_dir in SOURCE_DIRS:
+        paths.extend(path for path, _, _ in asset_index.files(source_dir))
+    sources = []
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            sources.append((path, stat.st_size, stat.st_mtime_ns))
+    return sources
+
+def hash_source(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:20]
+
+def load_index(path=VARIANTS_INDEX):
+    if not os.path.exists(path):
+        return {"sources": {}, "variants": {}, "placeholders": {}}
+    with open(path, "r") as file:
+        index = json.load(file)
+    # Indexes from before placeholders existed
+    index.setdefault("placeholders", {})
+    return index
+
+def encode_variants(source, digest):
+    """Write a resized copy plus a WebP copy of source at each width below its own, returning [[width, path, webp_path], ...]"""
+    from PIL import Image, ImageOps
+
+    extension = ".png" if source.lower().endswith(".png") else ".jpg"
+    variants = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        # Always produce at least one variant, capped at the original width
+        widths = [width for width in WIDTHS if width < image.width] or [image.width]
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            path = f"{VARIANTS_DIR}/{digest}-{width}{extension}"
+            webp_path = f"{VARIANTS_DIR}/{digest}-{width}.webp"
+            if extension == ".jpg":
+                resized.convert("RGB").save(path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                resized.save(path, "PNG", optimize=True)
+            resized.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=6)
+            variants.append([width, path, webp_path])
+    return variants
+
+def encode_placeholder(source):
+    """Return {"size": [width, height], "uri": data URI of a blurred PLACEHOLDER_WIDTH px JPEG} for source"""
+    import base64
+    import io
+    from PIL import Image, ImageFilter, ImageOps
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        height = max(round(image.height * PLACEHOLDER_WIDTH / image.width), 1)
+        small = image.convert("RGB").resize((PLACEHOLDER_WIDTH, height), Image.BILINEAR)
+        small = small.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR))
+        buffer = io.BytesIO()
+        small.save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+        return {"size": [image.width, image.height],
+                "uri": "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()}
+
+def build_variants(jobs=1):
+    """Encode missing variants for every source image in a pool of jobs processes and rewrite the variants index"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow is not installed, skipping responsive images")
+        return False
+
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+    index = load_index()
+    sources = {}
+    variants = {}
+    placeholders = {}
+    pending = {}
+    pending_placeholders = {}
+    for source, size, mtime_ns in find_sources():
+        source = os.path.normpath(source)
+        # Only re-hash a source when its size or mtime moved
+        cached = index["sources"].get(source)
+        if cached and cached["size"] == size and cached["mtime_ns"] == mtime_ns:
+            digest = cached["hash"]
+        else:
+            digest = hash_source(source)
+        sources[source] = {"size": size, "mtime_ns": mtime_ns, "hash": digest}
+
+        cached_variants = index["variants"].get(digest)
+        if cached_variants and all(os.path.exists(path) and os.path.exists(webp_path) for _, path, webp_path in cached_variants):
+            variants[digest] = cached_variants
+        else:
+            pending.setdefault(digest, source)
+
+        # Placeholders live in the index itself, keyed by the same hash
+        if digest in index["placeholders"]:
+            placeholders[digest] = index["placeholders"][digest]
+        else:
+            pending_placeholders.setdefault(digest, source)
+
+    if pending or pending_placeholders:
+        print(f"Encoding {len(pending)} image(s) and {len(pending_placeholders)} placeholder(s)")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            futures = {digest: pool.submit(encode_variants, path, digest) for digest, path in pending.items()}
+            placeholder_futures = {digest: pool.submit(encode_placeholder, path) for digest, path in pending_placeholders.items()}
+            for digest, future in futures.items():
+                try:
+                    variants[digest] = future.result()
+                except Exception as error:
+                    print(f"Could not encode {pending[digest]}: {error}")
+            for digest, future in placeholder_futures.items():
+                try:
+                    placeholders[digest] = future.result()
+                except Exception as error:
+                    print(f"Could not encode a placeholder for {pending_placeholders[digest]}: {error}")
+
+    with open(VARIANTS_INDEX, "w") as file:
+        json.dump({"sources": sources, "variants": variants, "placeholders": placeholders}, file, indent=1, sort_keys=True)
+    global _index
+    _index = None
+    return True
+
+#______________________________________________________________________________
+#markup
+_index = None
+
+def source_entry(path):
+    global _index
+    if _index is None:
+        _index = load_index()
+    return _index["sources"].get(os.path.normpath(path))
+
+def variants_for(path):
+    source = source_entry(path)
+    return _index["variants"].get(source["hash"], []) if source else []
+
+def placeholder_for(path):
+    source = source_entry(path)
+    return _index["placeholders"].get(source["hash"]) if source else None
+
+def variant_url(variant_path, source_path, source_url):
+    # Re-root a variant's filesystem path onto the URL the page uses for its source
+    relative = posixpath.relpath(variant_path, posixpath.dirname(source_path))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_url), relative))
+
+def lazy_attributes(source_path):
+    # loading="lazy", plus the blurred placeholder as a background of the slot the width and height reserve
+    placeholder = placeholder_for(source_path)
+    if placeholder is None:
+        return 'loading="lazy" decoding="async"'
+    return f'loading="lazy" decoding="async" style="background: center / cover no-repeat url({placeholder["uri"]})"'
+
+def size_attributes(source_path):
+    # width and height from the image header let the browser reserve the slot at the photo's aspect ratio
+    size = image_probe.dimensions(source_path)
+    return f' width="{size[0]}" height="{size[1]}"' if size else ""
+
+def picture(source_path, source_url, attributes, sizes, lazy=False):
+    """Return an <img> for source_url, wrapped in a <picture> with WebP and resized srcsets when variants exist"""
+    attributes += size_attributes(source_path)
+    if lazy:
+        attributes = f"{attributes} {lazy_attributes(source_path)}"
+    variants = variants_for(source_path)
+    if not variants:
+        return f'<img src="{source_url}" {attributes}>'
+
+    srcset = ", ".join(f"{variant_url(path, source_path, source_url)} {width}w" for width, path, _ in variants)
+    webp_srcset = ", ".join(f"{variant_url(webp_path, source_path, source_url)} {width}w" for width, _, webp_path in variants)
+    return (f'<picture><source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}">'
+            f'<img src="{source_url}" srcset="{srcset}" sizes="{sizes}" {attributes}></picture>')
@@ -0,0 +1,146 @@
+import json
+import os
+import struct
+import asset_index
+import build_report
+
+# Images the pages show that the asset index does not list, relative to pages_py/
+EXTRA_DIRS = ["../images/Announcements"]
+EXTRA_FILES = ["../images/sase_logo.png"]
+
+# path -> [size, mtime_ns, width, height] from the last run; width and height are null for unreadable files
+CACHE_PATH = ".image_sizes.json"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start-of-frame markers carry the dimensions; C4, C8 and CC share the range but are not frames
+SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# EXIF orientations that turn the stored image a quarter, so the displayed width is the stored height
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+#______________________________________________________________________________
+#header parsing
+def probe(path):
+    """(width, height) as displayed, read from the PNG or JPEG header without decoding pixels, or None"""
+    try:
+        with open(path, "rb") as file:
+            head = file.read(24)
+            if head.startswith(PNG_SIGNATURE) and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head.startswith(b"\xff\xd8"):
+                file.seek(2)
+                return probe_jpeg(file)
+    except OSError:
+        pass
+    return None
+
+def probe_jpeg(file):
+    # Walk the segment headers, seeking past each body, until the frame header
+    orientation = 1
+    while True:
+        byte = file.read(1)
+        while byte == b"\xff":
+            marker = file.read(1)
+            if marker != b"\xff":
+                break
+        else:
+            return None
+        if not marker or marker[0] == 0xD9:
+            return None
+        if marker[0] == 0x01 or 0xD0 <= marker[0] <= 0xD8:
+            continue
+        length_bytes = file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker[0] in SOF_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return (height, width) if orientation in TRANSPOSED_ORIENTATIONS else (width, height)
+        if marker[0] == 0xE1:
+            segment = file.read(length - 2)
+            orientation = exif_orientation(segment) or orientation
+        else:
+            file.seek(length - 2, os.SEEK_CUR)
+
+def exif_orientation(segment):
+    """The orientation tag of an APP1 Exif segment's first IFD, or None"""
+    if not segment.startswith(b"Exif\x00\x00") or len(segment) < 14:
+        return None
+    tiff = segment[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+    for entry in range(offset + 2, min(offset + 2 + count * 12, len(tiff) - 9), 12):
+        tag, _, _, value = struct.unpack(order + "HHIH", tiff[entry:entry + 10])
+        if tag == 0x0112:
+            return value
+    return None
+
+#______________________________________________________________________________
+#cache
+_sizes = None
+
+def load_cache(path=CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f"Could not read image size cache {path}, reprobing")
+        return {}
+
+def find_images():
+    # (path, size, mtime_ns) for every image the pages can show, from the asset index where possible
+    images = []
+    for root in asset_index.ASSET_ROOTS:
+        images.extend(asset_index.files(root))
+    for directory in EXTRA_DIRS:
+        if os.path.isdir(directory):
+            for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+                if entry.name.lower().endswith(asset_index.IMAGE_EXTENSIONS):
+                    stat = entry.stat()
+                    images.append((os.path.join(directory, entry.name), stat.st_size, stat.st_mtime_ns))
+    for path in EXTRA_FILES:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            images.append((path, stat.st_size, stat.st_mtime_ns))
+    return images
+
+def refresh(path=CACHE_PATH):
+    """Probe every image whose size or mtime moved since the last run and persist the cache; call after asset_index.refresh"""
+    global _sizes
+    cached = load_cache(path)
+    sizes = {}
+    for image, size, mtime_ns in find_images():
+        image = os.path.normpath(image)
+        entry = cached.get(image)
+        if entry is None or entry[:2] != [size, mtime_ns]:
+            entry = [size, mtime_ns, *(probe(image) or (None, None))]
+            build_report.count("images_probed")
+        sizes[image] = entry
+    with open(path, "w") as file:
+        json.dump(sizes, file, indent=1, sort_keys=True)
+    _sizes = sizes
+    return sizes
+
+def dimensions(path):
+    """(width, height) of the image at path, from the cache while its size and mtime match, else probed now"""
+    global _sizes
+    if _sizes is None:
+        _sizes = load_cache()
+    path = os.path.normpath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    entry = _sizes.get(path)
+    if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+        entry = _sizes[path] = [stat.st_size, stat.st_mtime_ns, *(probe(path) or (None, None))]
+    return tuple(entry[2:]) if entry[2] is not None else None
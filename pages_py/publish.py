@@ -0,0 +1,164 @@
+import concurrent.futures
+import gzip
+import hashlib
+import importlib.util
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import asset_pipeline
+import service_worker
+import site_layout
+import templates
+
+# Files the host serves, relative to pages_py/: the generated pages and data, the service worker and its
+# manifest, the vendored assets and the optimized overlay
+PUBLISH_ROOTS = ["index.html", "pages_py", service_worker.WORKER_PATH, service_worker.MANIFEST_PATH,
+                 "../bootstrap-5.3.3-dist", asset_pipeline.DIST_DIR]
+TEXT_EXTENSIONS = (".html", ".css", ".js", ".json", ".ics", ".svg", ".map", ".txt", ".xml")
+# Below this a compressed copy saves less than its headers cost
+MIN_BYTES = 256
+
+# Read by the web server config; keys are URL paths relative to the site root
+MANIFEST_PATH = "publish_manifest.json"
+
+# Fingerprinted names never change content, everything else is revalidated against its ETag; for sw.js
+# that is what lets browsers find a new worker as soon as it is published
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{10}\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# encoding -> sibling suffix; brotli is optional and only used when the module is installed
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+#______________________________________________________________________________
+#compression
+def compress(path, encodings):
+    """Write a sibling of path for each encoding that comes out smaller, removing any that does not; returns {encoding: size}"""
+    with open(path, "rb") as file:
+        data = file.read()
+    sizes = {}
+    for encoding in encodings:
+        if encoding == "br":
+            import brotli
+            compressed = brotli.compress(data, quality=11)
+        else:
+            # mtime=0 keeps the bytes, and so the sibling, identical across builds
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        sibling = path + SUFFIXES[encoding]
+        if len(compressed) < len(data):
+            templates.replace_if_changed(sibling, compressed)
+            sizes[encoding] = len(compressed)
+        elif os.path.exists(sibling):
+            os.remove(sibling)
+    return sizes
+
+def remove_siblings(path):
+    for suffix in SUFFIXES.values():
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+#______________________________________________________________________________
+#manifest
+def find_files(roots=PUBLISH_ROOTS):
+    # (path, size, mtime_ns) for every text file under the roots, skipping our own siblings and temp files
+    files = []
+    for root in roots:
+        paths = [root] if os.path.isfile(root) else []
+        for directory, _, names in os.walk(root):
+            paths.extend(os.path.join(directory, name) for name in sorted(names) if not name.startswith("."))
+        for path in paths:
+            if path.endswith(TEXT_EXTENSIONS):
+                stat = os.stat(path)
+                files.append((os.path.normpath(path), stat.st_size, stat.st_mtime_ns))
+    return files
+
+def url_for(path):
+    # The dist overlay is served at the site root, in place of the source files it has optimized copies of
+    dist_dir = os.path.abspath(asset_pipeline.DIST_DIR)
+    if os.path.abspath(path).startswith(dist_dir + os.sep):
+        return os.path.relpath(os.path.abspath(path), dist_dir).replace(os.sep, "/")
+    return site_layout.url_for(path)
+
+def served_files():
+    """url -> (path, size, mtime_ns) of the file the host serves at each URL, dist copies over their sources"""
+    # DIST_DIR is the last root, so its copies replace the sources they were made from
+    return {url_for(path): (path, size, mtime_ns) for path, size, mtime_ns in find_files()}
+
+def cache_headers(url, digest, encodings):
+    """Content-Type, Cache-Control and an ETag per representation for one file"""
+    etag = f'"{digest[:16]}"'
+    return {
+        "content_type": mimetypes.guess_type(url)[0] or "application/octet-stream",
+        "cache_control": IMMUTABLE if FINGERPRINT_RE.search(posixpath.basename(url)) else REVALIDATE,
+        "etag": etag,
+        # Each encoding is its own representation, so it gets its own validator
+        "encodings": {encoding: {"path": url + SUFFIXES[encoding], "size": size, "etag": f'"{digest[:16]}-{encoding}"'}
+                      for encoding, size in encodings.items()},
+    }
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {"encodings": [], "files": {}}
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        print(f"Could not read publish manifest {path}, recompressing")
+        return {"encodings": [], "files": {}}
+
+def publish(jobs=1):
+    """Precompress every text file the host serves in a pool of jobs processes and rewrite the publish manifest"""
+    encodings = ["gzip"]
+    if importlib.util.find_spec("brotli") is not None:
+        encodings.insert(0, "br")
+    else:
+        print("brotli is not installed, writing gzip copies only")
+
+    previous = load_manifest()
+    # A change of available encodings invalidates every entry
+    cached_files = previous["files"] if previous["encodings"] == encodings else {}
+    files = {}
+    pending = {}
+    for url, (path, size, mtime_ns) in served_files().items():
+        cached = cached_files.get(url)
+        if cached and cached["source"] != path:
+            cached = None
+        # Only re-hash a file when its size or mtime moved, and only recompress when the hash did
+        if cached and cached["size"] == size and cached["mtime_ns"] == mtime_ns:
+            digest = cached["sha256"]
+        else:
+            with open(path, "rb") as file:
+                digest = hashlib.sha256(file.read()).hexdigest()
+        entry = {"source": path, "size": size, "mtime_ns": mtime_ns, "sha256": digest}
+        if (cached and cached["sha256"] == digest
+                and all(os.path.exists(path + SUFFIXES[encoding]) for encoding in cached["encodings"])):
+            entry.update(cache_headers(url, digest, {encoding: value["size"] for encoding, value in cached["encodings"].items()}))
+        elif size < MIN_BYTES:
+            remove_siblings(path)
+            entry.update(cache_headers(url, digest, {}))
+        else:
+            pending[url] = path
+        files[url] = entry
+
+    if pending:
+        print(f"Compressing {len(pending)} file(s)")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            futures = {url: pool.submit(compress, path, encodings) for url, path in pending.items()}
+            for url, future in futures.items():
+                try:
+                    sizes = future.result()
+                except Exception as error:
+                    print(f"Could not compress {pending[url]}: {error}")
+                    sizes = {}
+                files[url].update(cache_headers(url, files[url]["sha256"], sizes))
+
+    # Files that are gone, or no longer served because a dist copy took over, take their compressed copies with them
+    sources = {entry["source"] for entry in files.values()}
+    for entry in previous["files"].values():
+        if entry["source"] not in sources:
+            remove_siblings(entry["source"])
+
+    templates.write_if_changed(MANIFEST_PATH, json.dumps({"encodings": encodings, "files": files}, indent=1, sort_keys=True))
+    return True
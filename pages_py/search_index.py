@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import unicodedata
+import dataset
+import templates
+
+# The index is a small header, documents in fixed-size blocks and shards of terms by prefix, relative to pages_py/
+SEARCH_DIR = "pages_py/search"
+INDEX_PATH = f"{SEARCH_DIR}/index.json"
+DOC_BLOCK_SIZE = 256
+# A first-character shard bigger than this is split by the first two characters
+SHARD_BYTES = 32 * 1024
+
+# Pages each kind of result links to, relative to the site root, unless the doc names its own
+PAGES = {"Event": "pages_py/calender.html", "Gallery": "pages_py/gallery.html", "Announcement": "index.html"}
+# Kinds whose results scroll to the title on their page with a text fragment
+FRAGMENT_KINDS = ["Event", "Gallery"]
+
+# A document scores the weight of the field a term appears in, summed over its occurrences
+FIELD_WEIGHTS = {"name": 3, "kind": 2, "location": 2, "date": 2, "description": 1}
+STOP_WORDS = frozenset("an and are as at be by for from has in is it of on or our the to we will with you your".split())
+MIN_TERM_LENGTH = 2
+
+# Search.js tokenizes queries the same way: lowercase, strip accents, split on anything but letters and digits
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+#______________________________________________________________________________
+#documents
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [token for token in TOKEN_RE.findall(text) if len(token) >= MIN_TERM_LENGTH and token not in STOP_WORDS]
+
+def documents(data, gallery_page=None):
+    """Yield (fields, doc) for every item a page shows: future events, gallery events and announcements already out"""
+    # A doc is [kind, title, ISO date], plus its page or link when that is not the kind's page
+    for event in data.future_events():
+        fields = {"name": event.name, "kind": event.kind, "location": event.location,
+                  "description": event.description, "date": f"{event.date:%B %Y}"}
+        yield fields, ["Event", event.name, event.date.isoformat()]
+
+    # gallery_page(season, year) names the page of each semester when the gallery is split by semester
+    for season, year, semester_events in data.gallery_semesters:
+        page = [gallery_page(season, year)] if gallery_page else []
+        for event in semester_events:
+            fields = {"name": event.name, "description": event.description, "date": f"{event.date:%B %Y}"}
+            yield fields, ["Gallery", event.name, event.date.isoformat(), *page]
+
+    for announcement in data.recent_announcements():
+        fields = {"name": announcement.name, "description": announcement.description, "date": f"{announcement.date:%B %Y}"}
+        doc = ["Announcement", announcement.name, announcement.date.isoformat()]
+        yield fields, doc + [announcement.link] if announcement.link else doc
+
+#______________________________________________________________________________
+#index
+def build_index(data, gallery_page=None):
+    """Return (docs, shards): docs in index order and shards as key -> {"terms", "postings"}"""
+    docs = []
+    postings = {}
+    for fields, doc in documents(data, gallery_page):
+        doc_id = len(docs)
+        docs.append(doc)
+        for field, text in fields.items():
+            for term in tokenize(text):
+                weights = postings.setdefault(term, {})
+                weights[doc_id] = weights.get(doc_id, 0) + FIELD_WEIGHTS[field]
+
+    # Terms are sorted so the client finds every completion of a prefix with one binary search,
+    # and each posting list is flattened to [doc id gap, weight, ...] to keep the numbers small
+    shards = {}
+    for term in sorted(postings):
+        shard = shards.setdefault(term[0], {"terms": [], "postings": []})
+        flat = []
+        previous = 0
+        for doc_id, weight in sorted(postings[term].items()):
+            flat += [doc_id - previous, weight]
+            previous = doc_id
+        shard["terms"].append(term)
+        shard["postings"].append(flat)
+
+    # Split oversized shards so a query never fetches much more than it needs
+    for key in [key for key, shard in shards.items() if len(dump(shard)) > SHARD_BYTES]:
+        shard = shards.pop(key)
+        for term, flat in zip(shard["terms"], shard["postings"]):
+            split = shards.setdefault(term[:2], {"terms": [], "postings": []})
+            split["terms"].append(term)
+            split["postings"].append(flat)
+    return docs, shards
+
+def dump(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+def write_search_index(gallery_page=None):
+    """Write the index Search.js reads: index.json, docs-<n>.json blocks and one <prefix>.json per shard"""
+    docs, shards = build_index(dataset.current(), gallery_page)
+    files = {os.path.basename(INDEX_PATH): {"pages": PAGES, "fragments": FRAGMENT_KINDS, "shards": sorted(shards),
+                                            "docs": len(docs), "block": DOC_BLOCK_SIZE}}
+    for block, start in enumerate(range(0, len(docs), DOC_BLOCK_SIZE)):
+        files[f"docs-{block}.json"] = docs[start:start + DOC_BLOCK_SIZE]
+    for key, shard in shards.items():
+        files[f"{key}.json"] = shard
+
+    os.makedirs(SEARCH_DIR, exist_ok=True)
+    for name, value in files.items():
+        templates.write_if_changed(f"{SEARCH_DIR}/{name}", dump(value))
+    # Drop shards and blocks this build no longer has
+    for name in os.listdir(SEARCH_DIR):
+        if name.endswith(".json") and name not in files:
+            os.remove(f"{SEARCH_DIR}/{name}")
+    return True
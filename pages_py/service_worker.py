@@ -0,0 +1,80 @@
+import hashlib
+import html
+import json
+import os
+import posixpath
+import re
+import urllib.parse
+import asset_pipeline
+import site_layout
+import templates
+
+# Written to the generated root, and so served at the site root where the worker's scope covers every page
+WORKER_PATH = "sw.js"
+MANIFEST_PATH = "precache-manifest.json"
+WORKER_SOURCE = "../bootstrap-5.3.3-dist/js/ServiceWorker.js"
+
+# Assets a page needs to render: its scripts and stylesheets. Images are left to the worker's runtime cache
+TAG_RE = re.compile(r"<(script|link)\b[^>]*>", re.IGNORECASE)
+URL_ATTR_RE = re.compile(r"""\b(?:src|href)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+#______________________________________________________________________________
+#site paths
+def path_for(url):
+    # The optimized copy the host serves over the source when --optimize-assets wrote one
+    dist_path = os.path.join(asset_pipeline.DIST_DIR, url)
+    return dist_path if os.path.isfile(dist_path) else site_layout.path_for(url)
+
+def page_assets(page):
+    """(found, missing): site URLs of the local scripts and stylesheets the page at path page loads, as served"""
+    page_url = site_layout.url_for(page)
+    with open(path_for(page_url), "r", encoding="utf-8") as file:
+        text = file.read()
+    page_dir = posixpath.dirname(page_url)
+    found = []
+    missing = []
+    for match in TAG_RE.finditer(text):
+        tag, name = match.group(0), match.group(1).lower()
+        if name == "link" and "stylesheet" not in tag:
+            continue
+        attr = URL_ATTR_RE.search(tag)
+        if attr is None:
+            continue
+        parts = urllib.parse.urlsplit(html.unescape(attr.group(1)))
+        if parts.scheme or parts.netloc or not parts.path:
+            continue
+        url = posixpath.normpath(parts.path[1:] if parts.path.startswith("/") else posixpath.join(page_dir, parts.path))
+        path = path_for(url) if not url.startswith("../") else None
+        (found if path is not None and os.path.isfile(path) else missing).append(url)
+    return found, missing
+
+#______________________________________________________________________________
+#manifest
+def hash_file(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:16]
+
+def write_service_worker(outputs):
+    """Write precache-manifest.json, {version, files: {url: content hash}} for the pages among outputs and the assets they load,
+    and sw.js; returns False if a page loads a local file that does not exist"""
+    urls = set()
+    ok = True
+    for path in outputs:
+        if path.endswith(".html") and os.path.isfile(path):
+            urls.add(site_layout.url_for(path))
+            found, missing = page_assets(path)
+            urls.update(found)
+            # Left out of the precache, since one failed download fails the worker's whole install
+            for url in missing:
+                print(f"{path} loads {url}, which does not exist")
+                ok = False
+
+    files = {url: hash_file(path_for(url)) for url in sorted(urls)}
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:16]
+    templates.write_if_changed(MANIFEST_PATH, json.dumps({"version": version, "files": files}, indent=1, sort_keys=True))
+
+    # A new version changes sw.js itself, which is what makes browsers install the new worker
+    with open(WORKER_SOURCE, "r", encoding="utf-8") as file:
+        source = file.read()
+    templates.write_if_changed(WORKER_PATH, f"const PRECACHE_VERSION = '{version}';\n" + source)
+    return ok
@@ -0,0 +1,22 @@
+import os
+import posixpath
+
+# The site is pages_py/ overlaid on the repo root. A generated file's URL is its path relative to pages_py/
+# (index.html, pages_py/calender.html), a repo file's its path relative to the repo root (images/..., bootstrap-5.3.3-dist/...).
+# Both roots are relative to pages_py/, where the generator runs
+GENERATED_ROOT = "."
+REPO_ROOT = ".."
+
+def url_for(path):
+    """Site URL path, without the leading slash, of the file at path"""
+    url = os.path.relpath(os.path.abspath(path), os.path.abspath(GENERATED_ROOT)).replace(os.sep, "/")
+    return url[len("../"):] if url.startswith("../") else url
+
+def path_for(url):
+    """The file or directory served at a site URL path, the generated one over the repo's, or None if there is neither"""
+    url = posixpath.normpath("/" + url).lstrip("/") or "."
+    for root in (GENERATED_ROOT, REPO_ROOT):
+        path = os.path.normpath(os.path.join(root, url))
+        if os.path.exists(path):
+            return path
+    return None
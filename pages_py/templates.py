@@ -0,0 +1,110 @@
+import os
+import re
+import tempfile
+import build_report
+
+# Comment markers look like <!--X--> ... <!--End of X-->, with optional padding inside the comment
+COMMENT_RE = re.compile(r"<!--\s*(.*?)\s*-->", re.DOTALL)
+END_PREFIX = "End of "
+
+# Regions in the site templates that close at the next section's marker instead of an End of marker
+IMPLICIT_ENDS = {"Carousel": "Navigation Bar", "Event Modals": "Footer"}
+
+_cache = {}
+
+# Read once at import; os.umask can only be queried by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+class Template:
+    """A template file split into named marker regions, parsed in a single pass over its comments"""
+
+    def __init__(self, path, content, ends=IMPLICIT_ENDS):
+        self.path = path
+        self.content = content
+        # name -> (start, end): start is just past the opening marker, end is where the closing marker begins
+        self.regions = {}
+
+        opened = {}
+        for match in COMMENT_RE.finditer(content):
+            name = match.group(1)
+            if name.startswith(END_PREFIX) and name[len(END_PREFIX):] in opened:
+                self.close(name[len(END_PREFIX):], opened, match.start())
+            for region, end_name in ends.items():
+                if end_name == name and region in opened:
+                    self.close(region, opened, match.start())
+            if name not in self.regions:
+                opened.setdefault(name, match.end())
+
+    def close(self, name, opened, end):
+        self.regions[name] = (opened.pop(name), end)
+
+    def missing(self, *names):
+        return [name for name in names if name not in self.regions]
+
+    def static_parts(self, names):
+        """The template text outside the given regions, in order"""
+        parts = []
+        position = 0
+        for start, end in sorted(self.regions[name] for name in names if name in self.regions):
+            parts.append(self.content[position:start])
+            position = end
+        parts.append(self.content[position:])
+        return parts
+
+    def render(self, replacements):
+        """Return the template with each named region's body replaced; values may be strings or iterables of fragments"""
+        parts = []
+        position = 0
+        for start, end, name in sorted((*self.regions[name], name) for name in replacements):
+            parts.append(self.content[position:start])
+            body = replacements[name]
+            parts.append(body if isinstance(body, str) else "".join(body))
+            position = end
+        parts.append(self.content[position:])
+        return "".join(parts)
+
+def load(path, ends=IMPLICIT_ENDS):
+    """Parse path into a Template, reusing the cached parse while the file is unchanged"""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with build_report.stage("template"), open(path, "r", encoding="utf-8") as file:
+        template = Template(path, file.read(), ends)
+    _cache[path] = (key, template)
+    return template
+
+def write_if_changed(path, content):
+    """Atomically replace path with content via a temp file and rename, only when the bytes differ; returns whether it wrote"""
+    with build_report.stage("write"):
+        written = replace_if_changed(path, content.encode("utf-8"))
+    build_report.count("files_written" if written else "files_unchanged")
+    return written
+
+def replace_if_changed(path, data):
+    try:
+        with open(path, "rb") as file:
+            if file.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        # mkstemp creates the file owner-only; keep the old file's mode, or give a new one the usual umask default
+        if os.path.exists(path):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        else:
+            os.chmod(temp_path, 0o666 & ~UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    _cache.pop(path, None)
+    build_report.count("bytes_written", len(data))
+    return True
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The generator's modules are flat and import each other by bare name, as when run from pages_py/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,64 @@
+import datetime
+import os
+import pytest
+import archive_store
+import csv_loader
+
+HEADER = "Name,Date,Kind,Time,Location,Description\n"
+
+@pytest.fixture
+def events_csv(tmp_path, monkeypatch):
+    path = tmp_path / "UpcomingEvents.csv"
+    monkeypatch.setattr(archive_store, "DB_PATH", str(tmp_path / "archive.sqlite3"))
+    monkeypatch.setitem(archive_store.TABLES, "events", (csv_loader.UpcomingEvent, str(path)))
+    yield path
+    archive_store.close()
+
+def write(path, rows, mtime_ns):
+    path.write_text(HEADER + "".join(f"{row},1/1/2025,Social,6 PM,Union,Text\n" if "/" not in row else row + "\n" for row in rows))
+    # Bump the mtime explicitly so a rewrite within the clock's resolution is still seen
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def source(path):
+    return archive_store.connect().execute("SELECT rows, generation FROM sources WHERE path = ?", (str(path),)).fetchone()
+
+def names(records):
+    return [record.name for record in records]
+
+def test_append_parses_only_new_lines(events_csv):
+    write(events_csv, ["A", "B"], 1_000_000_000)
+    assert names(archive_store.live("events")) == ["A", "B"]
+    assert source(events_csv) == (2, 1)
+
+    write(events_csv, ["A", "B", "C"], 2_000_000_000)
+    assert names(archive_store.live("events")) == ["A", "B", "C"]
+    # Same generation: the rows were appended rather than resynced
+    assert source(events_csv) == (3, 1)
+
+def test_full_sync_marks_dropped_rows_removed(events_csv):
+    write(events_csv, ["A", "B", "C"], 1_000_000_000)
+    archive_store.live("events")
+
+    write(events_csv, ["A", "C"], 2_000_000_000)
+    assert names(archive_store.live("events")) == ["A", "C"]
+    assert source(events_csv) == (2, 2)
+    # B had already happened when it left the CSV, so the archive still has it
+    archived = archive_store.archived("events", datetime.date(2025, 12, 31))
+    assert sorted(names(archived)) == ["A", "B", "C"]
+
+    write(events_csv, ["A", "B", "C"], 3_000_000_000)
+    assert names(archive_store.live("events")) == ["A", "B", "C"]
+
+def test_edit_before_the_end_is_a_full_sync(events_csv):
+    write(events_csv, ["A", "B"], 1_000_000_000)
+    archive_store.live("events")
+
+    write(events_csv, ["A2", "B", "C"], 2_000_000_000)
+    assert sorted(names(archive_store.live("events"))) == ["A2", "B", "C"]
+    assert source(events_csv) == (3, 2)
+
+def test_repeats_keep_csv_order_oldest_first(events_csv):
+    write(events_csv, ["GBM,3/1/2025,Social,6 PM,Union,First", "GBM,3/1/2025,Social,8 PM,Union,Second"], 1_000_000_000)
+    assert [record.description for record in archive_store.live("events")] == ["First", "Second"]
+    archived = archive_store.archived("events", datetime.date(2025, 12, 31))
+    assert [record.description for record in reversed(archived)] == ["First", "Second"]
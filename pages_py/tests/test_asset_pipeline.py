@@ -0,0 +1,20 @@
+import asset_pipeline
+
+def test_selector_used():
+    assert asset_pipeline.selector_used(".card .card-body", {"card", "card-body"}, set())
+    assert not asset_pipeline.selector_used(".card .card-body", {"card"}, set())
+    assert asset_pipeline.selector_used("#footer a", set(), {"footer"})
+    assert not asset_pipeline.selector_used("#footer a", set(), set())
+
+def test_selector_used_ignores_functional_pseudo_class_arguments():
+    assert asset_pipeline.selector_used(".btn:not(.disabled)", {"btn"}, set())
+    assert asset_pipeline.selector_used(".nav :is(.active, .show)", {"nav"}, set())
+    assert asset_pipeline.selector_used(".row:has(> .col:not(#x))", {"row"}, set())
+    assert not asset_pipeline.selector_used(".btn:not(.disabled)", {"disabled"}, set())
+
+def test_purge_css_keeps_rules_with_a_used_selector():
+    css = ".btn:not(.disabled){color:red}.unused{color:blue}.unused,.btn{margin:0}"
+    purged = asset_pipeline.purge_css(css, {"btn"}, set())
+    assert ".btn:not(.disabled)" in purged
+    assert "color:blue" not in purged
+    assert "margin:0" in purged
@@ -0,0 +1,27 @@
+import datetime
+import ics_feed
+
+def t(hour, minute=0):
+    return datetime.time(hour, minute)
+
+def test_range_with_shared_period():
+    assert ics_feed.parse_time_range("6:00 - 8:00 PM") == (t(18), t(20))
+    assert ics_feed.parse_time_range("8:00-10:00 PM") == (t(20), t(22))
+
+def test_range_with_both_periods():
+    assert ics_feed.parse_time_range("11 AM - 1 PM") == (t(11), t(13))
+    assert ics_feed.parse_time_range("11:30 am to 12:15 pm") == (t(11, 30), t(12, 15))
+
+def test_start_without_period_stays_before_end():
+    # Sharing PM would put 11:00 PM after 1:00 PM, so the start is read as AM
+    assert ics_feed.parse_time_range("11:00 - 1:00 PM") == (t(11), t(13))
+
+def test_single_time_lasts_the_default_duration():
+    assert ics_feed.parse_time_range("12 AM") == (t(0), t(1))
+    assert ics_feed.parse_time_range("12 PM") == (t(12), t(13))
+    assert ics_feed.parse_time_range("7:30 PM") == (t(19, 30), t(20, 30))
+
+def test_unparseable_times():
+    assert ics_feed.parse_time_range("") is None
+    assert ics_feed.parse_time_range(None) is None
+    assert ics_feed.parse_time_range("TBD") is None
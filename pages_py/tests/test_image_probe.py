@@ -0,0 +1,42 @@
+import struct
+import image_probe
+
+def png(width, height):
+    return image_probe.PNG_SIGNATURE + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+def exif_segment(orientation, order="<"):
+    # TIFF header, then a one-entry IFD holding the orientation tag as a SHORT
+    tiff = (b"II" if order == "<" else b"MM") + struct.pack(order + "HI", 42, 8)
+    tiff += struct.pack(order + "H", 1) + struct.pack(order + "HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack(order + "I", 0)
+    body = b"Exif\x00\x00" + tiff
+    return b"\xff\xe1" + struct.pack(">H", len(body) + 2) + body
+
+def jpeg(width, height, segments=b""):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + bytes(3)
+    return b"\xff\xd8" + app0 + segments + sof + b"\xff\xd9"
+
+def probe(tmp_path, data, name="image"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return image_probe.probe(str(path))
+
+def test_png(tmp_path):
+    assert probe(tmp_path, png(640, 480)) == (640, 480)
+
+def test_jpeg(tmp_path):
+    assert probe(tmp_path, jpeg(200, 100)) == (200, 100)
+
+def test_jpeg_upright_orientation_keeps_dimensions(tmp_path):
+    assert probe(tmp_path, jpeg(200, 100, exif_segment(1))) == (200, 100)
+    assert probe(tmp_path, jpeg(200, 100, exif_segment(3, ">"))) == (200, 100)
+
+def test_jpeg_rotated_orientation_swaps_dimensions(tmp_path):
+    for orientation in (5, 6, 7, 8):
+        assert probe(tmp_path, jpeg(200, 100, exif_segment(orientation))) == (100, 200)
+    assert probe(tmp_path, jpeg(200, 100, exif_segment(6, ">"))) == (100, 200)
+
+def test_unreadable_files(tmp_path):
+    assert probe(tmp_path, b"GIF89a" + bytes(20)) is None
+    assert probe(tmp_path, jpeg(200, 100)[:24]) is None
+    assert image_probe.probe(str(tmp_path / "missing.jpg")) is None
@@ -0,0 +1,34 @@
+import templates
+
+CONTENT = ("<html><!--Navigation Bar-->nav<!--End of Navigation Bar-->"
+           "<!-- Carousel -->slides<!--Navigation Bar-->"
+           "<!--Footer-->foot<!--  End of Footer  --></html>")
+
+def test_regions_close_at_end_markers_and_implicit_ends():
+    template = templates.Template("page.html", CONTENT)
+    assert {name: CONTENT[start:end] for name, (start, end) in template.regions.items()} == {
+        "Navigation Bar": "nav",
+        "Carousel": "slides",
+        "Footer": "foot",
+    }
+
+def test_region_is_only_parsed_once():
+    # The second Navigation Bar marker only closes the carousel; it does not reopen the navigation bar
+    template = templates.Template("page.html", CONTENT)
+    assert template.regions["Navigation Bar"] == (CONTENT.index("nav"), CONTENT.index("<!--End of Navigation Bar"))
+
+def test_missing():
+    template = templates.Template("page.html", CONTENT)
+    assert template.missing("Footer", "Event Modals", "Navigation Bar") == ["Event Modals"]
+    assert templates.Template("page.html", "<!--Footer-->unclosed").missing("Footer") == ["Footer"]
+
+def test_render_replaces_bodies_in_document_order():
+    template = templates.Template("page.html", CONTENT)
+    rendered = template.render({"Footer": ["f", "oo"], "Navigation Bar": "NAV"})
+    assert rendered == CONTENT.replace(">nav<", ">NAV<").replace(">foot<", ">foo<")
+
+def test_static_parts_skip_unknown_regions():
+    template = templates.Template("page.html", CONTENT)
+    parts = template.static_parts(["Footer", "Carousel", "Event Modals"])
+    assert len(parts) == 3
+    assert "".join(parts) == CONTENT.replace("slides", "").replace("foot", "")
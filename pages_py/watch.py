@@ -0,0 +1,152 @@
+import functools
+import http.server
+import json
+import os
+import threading
+import time
+import urllib.parse
+import asset_index
+import image_pipeline
+import site_layout
+
+# Served pages poll this endpoint and reload themselves when their own output was rebuilt
+RELOAD_ENDPOINT = "/__livereload"
+RELOAD_SCRIPT = '''<script>
+  (function () {
+    var version = null;
+    setInterval(function () {
+      fetch("%s?path=" + encodeURIComponent(location.pathname))
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (version !== null && data.version !== version) location.reload();
+          version = data.version;
+        })
+        .catch(function () {});
+    }, 500);
+  })();
+</script>
+''' % RELOAD_ENDPOINT
+
+#______________________________________________________________________________
+#dev server
+class LiveReloadHandler(http.server.SimpleHTTPRequestHandler):
+    # Filled in by serve(): url path -> build version of that page
+    versions = {}
+
+    def translate_path(self, path):
+        # Serve the layout the host does, pages_py/ overlaid on the repo root, so the pages' relative URLs resolve
+        url = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        file_path = site_layout.path_for(url)
+        return os.path.abspath(file_path) if file_path is not None else super().translate_path(path)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == RELOAD_ENDPOINT:
+            path = urllib.parse.parse_qs(url.query).get("path", ["/"])[0]
+            if path.endswith("/"):
+                path += "index.html"
+            self.send_body(json.dumps({"version": self.versions.get(path, 0)}).encode(), "application/json")
+            return
+
+        file_path = self.translate_path(url.path)
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, "index.html")
+        if file_path.endswith(".html") and os.path.isfile(file_path):
+            with open(file_path, "r") as file:
+                content = file.read()
+            # Inject the reload script just before </body>, or at the end if the page has none
+            idx = content.rfind("</body>")
+            content = content[:idx] + RELOAD_SCRIPT + content[idx:] if idx != -1 else content + RELOAD_SCRIPT
+            self.send_body(content.encode(), "text/html; charset=utf-8")
+            return
+        super().do_GET()
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console for build output
+        pass
+
+def serve(port, versions):
+    handler = functools.partial(LiveReloadHandler, directory=os.path.abspath(site_layout.GENERATED_ROOT))
+    LiveReloadHandler.versions = versions
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+#______________________________________________________________________________
+#polling
+def mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def page_url(output):
+    return "/" + site_layout.url_for(output)
+
+def watch(pages, build_pages, port=8000, interval=0.3):
+    """Rebuild only the pages whose CSVs, template or image folders change, serving the site with live reload"""
+    # Which pages each watched file and image folder feeds
+    file_pages = {}
+    dir_pages = {}
+    for page, (_, inputs) in pages.items():
+        for path in list(inputs.get("csv_files", [])) + ([inputs["template"]] if "template" in inputs else []):
+            file_pages.setdefault(path, set()).add(page)
+        for path in inputs.get("image_dirs", []):
+            dir_pages.setdefault(os.path.normpath(path), set()).add(page)
+    # Pages reload when their own output changes; targets without a template have nothing to reload
+    outputs = {page: inputs.get("output", inputs["template"]) for page, (_, inputs) in pages.items() if "template" in inputs}
+
+    def watched_dirs():
+        return [path for path in asset_index.refresh() if any(path == root or path.startswith(root + "/") for root in dir_pages)]
+
+    versions = {}
+    server = serve(port, versions)
+    print(f"Serving pages_py/ over the repo root at http://127.0.0.1:{port}{page_url(outputs.get('index', 'index.html'))}")
+    print("Watching CSV_info, templates and image folders, press Ctrl+C to stop")
+
+    dirs = watched_dirs()
+    files_seen = {path: mtime(path) for path in file_pages}
+    dirs_seen = {path: mtime(path) for path in dirs}
+    try:
+        while True:
+            time.sleep(interval)
+            affected = set()
+            for path, seen in files_seen.items():
+                if mtime(path) != seen:
+                    affected |= file_pages[path]
+            images_changed = False
+            for path, seen in dirs_seen.items():
+                if mtime(path) != seen:
+                    images_changed = True
+                    affected |= {page for root, root_pages in dir_pages.items()
+                                 if path == root or path.startswith(root + "/") for page in root_pages}
+            if not affected:
+                continue
+
+            start = time.perf_counter()
+            if images_changed:
+                dirs = watched_dirs()
+                image_pipeline.build_variants()
+            before = {page: mtime(outputs[page]) for page in affected if page in outputs}
+            build_pages(targets=sorted(affected), jobs=1)
+            for page in before:
+                if mtime(outputs[page]) != before[page]:
+                    url = page_url(outputs[page])
+                    versions[url] = versions.get(url, 0) + 1
+            print(f"Rebuilt {', '.join(sorted(affected))} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+            # Re-read mtimes after the build so our own writes do not trigger another round
+            files_seen = {path: mtime(path) for path in file_pages}
+            dirs_seen = {path: mtime(path) for path in dirs}
+    except KeyboardInterrupt:
+        print("Stopping watch mode")
+    finally:
+        server.shutdown()